@@ -1,19 +1,40 @@
 import os
 import json
-import requests
-import subprocess
-import random
+import atexit
+import re
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from threading import Thread
-from flask import Flask, render_template, request, jsonify, url_for, redirect, session, flash
-from flask_socketio import SocketIO
+from flask import Flask, render_template, request, jsonify, url_for, redirect, session, flash, Response, stream_with_context
+from flask_socketio import SocketIO, join_room, emit
 from flask_login import LoginManager, login_required, current_user
 from dotenv import load_dotenv
 from openai import OpenAI
 from users.models import UserFilter, db, Favorite, User, Job, ChatMessage
 from flask_migrate import Migrate
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.interval import IntervalTrigger
+import click
+from search_jobs import SearchRegistry
+from presence import Presence
+from chat import ChatStore, DEFAULT_ROOM, MAX_MESSAGE_LENGTH
+from favorites import add_favorite, import_favorites_json
+from green import eventlet_patched, sqlite_engine_options
+from sqlite_profile import apply_sqlite_profile, current_pragmas, run_contention_benchmark
+from fulltext import ensure_fts, rebuild_fts, search_jobs
+from parser_daemon import ParserDaemon, spawn_parser
+from http_scraper import HttpScraper, NeedsBrowser, SOURCES as HTTP_SOURCES, parse_detail, parse_listing, make_record
+from known_links import known_links_filter
+from backgrounds import BackgroundPool
+from telegram_outbox import TelegramSender
+from search_cache import SearchCache, make_key
+from llm_cache import LLMCache, make_llm_key
+from config import Config
+from scheduling import SourceLimiter, CycleTracker
+from ingest import ingest_jobs, iter_batches
+from utils import parse_budget
+from pagination import keyset_page, encode_cursor, decode_cursor, PAGE_SIZE, MAX_PAGE_SIZE
+from sqlalchemy import func, case
+from sqlalchemy.orm import defer, undefer
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 load_dotenv(dotenv_path=os.path.join(basedir, '.env'))
@@ -21,7 +42,7 @@ load_dotenv(dotenv_path=os.path.join(basedir, '.env'))
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise ValueError("OPENAI_API_KEY не найден в .env")
-client = OpenAI(api_key=OPENAI_API_KEY)
+client = OpenAI(api_key=OPENAI_API_KEY, base_url=Config.OPENAI_BASE_URL)
 
 UNSPLASH_ACCESS_KEY = os.getenv("UNSPLASH_ACCESS_KEY")
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -30,8 +51,12 @@ app = Flask(__name__)
 app.secret_key = os.urandom(24)
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(basedir, 'db.sqlite3')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = sqlite_engine_options(os.path.join(basedir, 'db.sqlite3'), Config.SQLALCHEMY_ENGINE_OPTIONS)
 
-socketio = SocketIO(app)
+# С SOCKETIO_MESSAGE_QUEUE события из worker.py доходят до клиентов веб-процессов.
+# Режим eventlet — только если stdlib уже пропатчен (gunicorn -k eventlet): без патча
+# его green-потоки никто не планирует, и фоновые задачи (поиск, запись чата) не запускаются
+socketio = SocketIO(app, message_queue=Config.SOCKETIO_MESSAGE_QUEUE, async_mode=None if eventlet_patched() else "threading")
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = "users.login"
@@ -53,123 +78,282 @@ class AutoParseConfig(db.Model):
     active = db.Column(db.Boolean, default=True)
 
 with app.app_context():
+    apply_sqlite_profile(db.engine, Config.SQLITE_PRAGMAS)
     db.create_all()
+    with db.engine.begin() as connection:
+        ensure_fts(connection)
 
 migrate = Migrate(app, db)
 from users.routes import users_bp
 app.register_blueprint(users_bp, url_prefix='/auth')
 
-online_users = set()
-scheduler = BackgroundScheduler()
-scheduler.start()
-
-def load_global_favorites():
-    if hasattr(load_global_favorites, 'cache'):
-        return load_global_favorites.cache
-    path = os.path.join(basedir, "cache", "favorites.json")
-    if os.path.exists(path):
-        with open(path, encoding='utf-8') as f:
-            load_global_favorites.cache = json.load(f)
-    else:
-        load_global_favorites.cache = []
-    return load_global_favorites.cache
-
-def save_global_favorites(data):
-    path = os.path.join(basedir, "cache", "favorites.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    load_global_favorites.cache = data
+presence = Presence()
+chat_store = ChatStore(
+    app,
+    history_size=Config.CHAT_HISTORY_SIZE,
+    batch_size=Config.CHAT_BATCH_SIZE,
+    flush_interval=Config.CHAT_FLUSH_INTERVAL,
+    spawn=socketio.start_background_task
+)
+atexit.register(chat_store.flush)
+searches = SearchRegistry()
+search_cache = SearchCache(ttl=Config.CACHE_EXPIRATION, max_entries=Config.CACHE_MAX_ENTRIES)
+llm_cache = LLMCache(max_entries=Config.LLM_CACHE_MAX_ENTRIES)
+
+PARSERS = {
+    "upwork": os.path.join(basedir, "parsers", "puppeteer_upwork.js"),
+    "guru": os.path.join(basedir, "parsers", "puppeteer_guru.js"),
+}
+PARSER_DAEMON = os.getenv("PARSER_DAEMON", "1") == "1"
+parser_daemon = ParserDaemon(
+    os.path.join(basedir, "parsers", "parser_daemon.js"),
+    pool_size=int(os.getenv("PARSER_POOL_SIZE", "3")),
+    cwd=basedir,
+    production=Config.PARSER_PRODUCTION
+)
+atexit.register(parser_daemon.stop)
+http_scraper = HttpScraper(
+    cookies_dir=os.path.join(basedir, "parsers"),
+    timeout=Config.HTTP_SCRAPER_TIMEOUT,
+    pool_size=max(Config.DETAIL_CONCURRENCY.values())
+)
+source_limiters = {source: SourceLimiter(**Config.SOURCE_LIMITS[source]) for source in PARSERS}
+auto_parse_cycles = CycleTracker()
+AUTO_PARSE_STATS_PATH = os.path.join(basedir, "cache", "auto_parse_stats.json")
+telegram_sender = TelegramSender(
+    TELEGRAM_BOT_TOKEN,
+    api_base=Config.TELEGRAM_API_BASE,
+    per_second=Config.TELEGRAM_PER_SECOND,
+    chat_interval=Config.TELEGRAM_CHAT_INTERVAL
+)
+background_pool = BackgroundPool(
+    UNSPLASH_ACCESS_KEY,
+    os.path.join(basedir, "cache", "background.json"),
+    size=Config.BACKGROUND_POOL_SIZE,
+    ttl=Config.BACKGROUND_TTL
+)
 
 def extract_budget(task):
-    try:
-        budget_str = str(task.get('budget', '')).replace("$", "").replace(",", "").split("-")[0].strip()
-        return float(budget_str) if budget_str else 0
-    except Exception as e:
-        app.logger.error(f"Ошибка парсинга бюджета: {task.get('budget', '')} — {e}")
-        return 0
+    budget_min, _, _ = parse_budget(task.get('budget'))
+    return budget_min or 0
+
+def price_filtered(query):
+    """Apply ?min_price= / ?max_price= from the request to a Job query in SQL."""
+    min_price = request.args.get("min_price", type=float)
+    max_price = request.args.get("max_price", type=float)
+    if min_price is not None:
+        query = query.filter(Job.budget_max >= min_price)
+    if max_price is not None:
+        query = query.filter(Job.budget_min <= max_price)
+    return query
+
+def job_list_query(view):
+    """Return (query, keyset order) for a paginated job list, or None if the view is unavailable."""
+    if view == "favorites":
+        query = Job.query.join(Favorite, Favorite.job_id == Job.id).filter(Favorite.user_id == current_user.id)
+        return price_filtered(query), "budget"
+    if view == "admin":
+        if current_user.role != "admin":
+            return None
+        return Job.query.options(defer(Job.description), undefer(Job.description_preview)), "id"
+    query = price_filtered(Job.query.options(defer(Job.description), undefer(Job.description_preview)).filter(Job.user_id == current_user.id))
+    if view == "index" or (view == "tasks" and request.args.get("free") == "1"):
+        return query.filter(Job.status == "new"), "budget"
+    if view == "tasks":
+        return query, "budget"
+    if view == "my_tasks":
+        return query.filter(Job.status == "in_progress"), "budget"
+    if view == "completions":
+        return query.filter(Job.status == "done"), "budget"
+    return None
+
+def job_list_page(view):
+    query, order = job_list_query(view)
+    return keyset_page(query, request.args.get("cursor"), request.args.get("limit", type=int), order)
+
+def job_list_item(job, full=False):
+    return {
+        "id": job.id,
+        "title": job.title,
+        "budget": job.budget or "Не указан",
+        "budget_max": job.budget_max,
+        "status": job.status,
+        "link": job.link,
+        "description": job.description if full else job.description_preview
+    }
+
+def user_room(user_id):
+    return f"user_{user_id}"
+
+def emit_job_event(event, job, **changes):
+    """Send a job delta only to the rooms of the job's owner and assignee."""
+    payload = {"id": job.id, **changes}
+    for user_id in {job.user_id, job.assigned_to} - {None}:
+        socketio.emit(event, payload, to=user_room(user_id))
+
+def emit_jobs_ingested(user_id, jobs):
+    if jobs:
+        socketio.emit("job_ingested", {"jobs": [job_list_item(job) for job in jobs]}, to=user_room(user_id))
+
+def user_job_analytics():
+    """Taken/done job counts for every user in one grouped query over the (user_id, status, ...) index."""
+    rows = (
+        db.session.query(
+            User.username,
+            func.count(Job.id),
+            func.coalesce(func.sum(case((Job.status == "done", 1), else_=0)), 0)
+        )
+        .outerjoin(Job, Job.user_id == User.id)
+        .group_by(User.id, User.username)
+        .order_by(User.id)
+        .all()
+    )
+    return [{"username": username, "taken": taken, "done": done} for username, taken, done in rows]
 
 def get_unsplash_background():
-    topics = ["freelance", "coding", "ai", "technology", "cyberpunk", "dark"]
-    url = f"https://api.unsplash.com/photos/random?query={random.choice(topics)}&orientation=landscape&client_id={UNSPLASH_ACCESS_KEY}"
+    """Background URL from the prefetched pool; never touches the network."""
+    return background_pool.pick(url_for('static', filename='default.jpg'))
+
+def iter_browser_parser(source, topic, min_price, max_price, region, known=None):
+    """Yield jobs from one Puppeteer parser as it emits them, skipping links in `known`."""
+    concurrency = Config.DETAIL_CONCURRENCY[source]
+    if PARSER_DAEMON:
+        return parser_daemon.scrape_iter(source, topic, min_price, max_price, region, known=known, concurrency=concurrency)
+    args = ["node", PARSERS[source], topic, str(min_price), str(max_price or ""), region or "", str(concurrency)]
+    return spawn_parser(args, cwd=basedir, known=known, production=Config.PARSER_PRODUCTION)
+
+def iter_http_parser(source, topic, min_price, max_price, region, known=None):
+    """Plain HTTP first; Puppeteer only reads the pages HTTP could not."""
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return response.json()["urls"]["full"]
-    except Exception as e:
-        app.logger.error(f"Ошибка запроса к Unsplash: {e}")
-        return url_for('static', filename='default.jpg')
-
-def send_telegram_message(chat_id, message):
-    if not TELEGRAM_BOT_TOKEN:
-        app.logger.warning("Telegram token не найден в .env")
-        return
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    payload = {"chat_id": chat_id, "text": message, "parse_mode": "HTML"}
-    try:
-        response = requests.post(url, json=payload, timeout=5)
-        response.raise_for_status()
-    except Exception as e:
-        app.logger.error(f"Ошибка отправки Telegram: {e}")
-
-def run_auto_parse():
-    configs = AutoParseConfig.query.filter_by(active=True).all()
-    for config in configs:
-        user = User.query.get(config.user_id)
-        if not user:
-            continue
-        query = f"{config.product} {int(config.min_price)}"
-        jobs = []
-        base_path = "C:/Users/Mane/Desktop/Python/freelance-monitor/results"
+        yield from http_scraper.scrape_iter(source, topic, min_price, max_price, region,
+                                            known=known, concurrency=Config.DETAIL_CONCURRENCY[source])
+    except NeedsBrowser as e:
+        app.logger.info(f"{e}, продолжаем через Puppeteer")
+        yield from iter_browser_parser(source, topic, min_price, max_price, region, known=e.known)
+
+def iter_parser(source, topic, min_price, max_price, region, known=None):
+    """Yield jobs from one source as they are scraped, skipping links in `known`."""
+    if Config.SCRAPER_ENGINE == "http":
+        return iter_http_parser(source, topic, min_price, max_price, region, known)
+    return iter_browser_parser(source, topic, min_price, max_price, region, known)
+
+def iter_parsers(topic, min_price, max_price, region, known=None):
+    """Yield (source, job) pairs from all sources in arrival order.
+
+    A failed source does not stop the others; once all of them finish,
+    the failures are raised as one RuntimeError.
+    """
+    records = queue.Queue()
+
+    def worker(source):
+        count = 0
         try:
-            def run_parser(script):
-                subprocess.run(["node", script, config.product, str(config.min_price), str(config.max_price or ""), config.region or ""], check=True)
-            
-            upwork_thread = Thread(target=run_parser, args=("C:/Users/Mane/Desktop/Python/freelance-monitor/parsers/puppeteer_upwork.js",))
-            guru_thread = Thread(target=run_parser, args=("C:/Users/Mane/Desktop/Python/freelance-monitor/parsers/puppeteer_guru.js",))
-            upwork_thread.start()
-            guru_thread.start()
-            upwork_thread.join()
-            guru_thread.join()
-
-            for filename in ["upwork.json", "guru.json"]:
-                full_path = os.path.join(base_path, filename)
-                if os.path.exists(full_path):
-                    with open(full_path, encoding='utf-8') as f:
-                        file_jobs = json.load(f)
-                        app.logger.info(f"Автопарсинг: Загружено {len(file_jobs)} заказов из {filename}")
-                        jobs.extend(file_jobs)
-                else:
-                    app.logger.warning(f"Файл {full_path} не найден")
+            with source_limiters[source].slot():
+                for job in iter_parser(source, topic, min_price, max_price, region, known):
+                    records.put((source, job))
+                    count += 1
+            app.logger.info(f"Загружено {count} заказов из {source}")
         except Exception as e:
-            app.logger.error(f"Ошибка автопарсинга для конфигурации {config.id}: {e}")
+            app.logger.error(f"Ошибка парсера {source}: {e}")
+            records.put((source, e))
+        finally:
+            records.put((source, None))
+
+    for source in PARSERS:
+        Thread(target=worker, args=(source,), daemon=True).start()
+    remaining = len(PARSERS)
+    failures = []
+    while remaining:
+        source, job = records.get()
+        if job is None:
+            remaining -= 1
             continue
+        if isinstance(job, Exception):
+            failures.append(f"{source}: {job}")
+            continue
+        yield source, job
+    if failures:
+        raise RuntimeError(f"Ошибка парсера {'; '.join(failures)}")
+
+def matches_filter(job, min_price, max_price, region):
+    budget = extract_budget(job)
+    job_region = job.get('region', '').lower()
+    return ((not min_price or budget >= float(min_price)) and
+            (not max_price or budget <= float(max_price)) and
+            (not region or region.lower() in job_region))
+
+def normalize_product(product):
+    return " ".join((product or "").lower().split())
+
+def group_configs(configs):
+    """Group configs by normalized product and compute the widest scrape range for each."""
+    groups = {}
+    for config in configs:
+        groups.setdefault(normalize_product(config["product"]), []).append(config)
+    plans = []
+    for product, group in groups.items():
+        min_price = min(config["min_price"] or 0 for config in group)
+        max_price = None if any(not config["max_price"] for config in group) else max(config["max_price"] for config in group)
+        regions = {(config["region"] or "").strip().lower() for config in group}
+        region = regions.pop() if len(regions) == 1 else ""
+        plans.append({"product": product, "min_price": min_price, "max_price": max_price, "region": region, "configs": group})
+    return plans
+
+def auto_parse_message(job):
+    return f"📢 Новый заказ:\n{job.get('title') or 'Без названия'}\n💰 Бюджет: {job.get('budget') or 'Не указан'}\n🌍 Регион: {job.get('region') or 'Не указан'}\n🔗 {job.get('link', '').strip()}"
+
+def run_auto_parse_plan(plan, stats, known=None):
+    with app.app_context(), auto_parse_cycles.product(stats, plan["product"]) as entry:
+        records = (job for _, job in iter_parsers(plan["product"], plan["min_price"], plan["max_price"], plan["region"], known))
+        for batch in iter_batches(records):
+            for config in plan["configs"]:
+                matching = [job for job in batch if matches_filter(job, config["min_price"], config["max_price"], config["region"])]
+                if not matching:
+                    continue
+                try:
+                    new_jobs = ingest_jobs(matching, config["user_id"], notify=lambda job, chat_id=config["chat_id"]: (chat_id, auto_parse_message(job)))
+                except Exception as e:
+                    app.logger.error(f"Ошибка сохранения автопарсинга для конфигурации {config['id']}: {e}")
+                    db.session.rollback()
+                    continue
+                entry["new_jobs"] += len(new_jobs)
+                emit_jobs_ingested(config["user_id"], new_jobs)
 
-        for job in jobs:
-            budget = extract_budget(job)
-            job_region = job.get('region', '').lower()
-            if (config.min_price <= budget and
-                (not config.max_price or budget <= config.max_price) and
-                (not config.region or config.region.lower() in job_region) and
-                job.get("description") and job.get("link") and
-                not Job.query.filter_by(link=job['link']).first()):
-                new_job = Job(
-                    title=job.get("title", "Без названия"),
-                    description=job.get("description", ""),
-                    budget=job.get("budget", ""),
-                    link=job.get("link"),
-                    status="new",
-                    user_id=config.user_id
-                )
-                db.session.add(new_job)
-                message = f"📢 Новый заказ:\n{job.get('title', 'Без названия')}\n💰 Бюджет: {job.get('budget', 'Не указан')}\n🌍 Регион: {job.get('region', 'Не указан')}\n🔗 {job.get('link')}"
-                send_telegram_message(config.chat_id, message)
-        try:
-            db.session.commit()
-        except Exception as e:
-            app.logger.error(f"Ошибка сохранения автопарсинга: {e}")
-            db.session.rollback()
+def run_auto_parse():
+    with auto_parse_cycles.cycle() as stats:
+        if stats is None:
+            app.logger.warning("Автопарсинг: предыдущий цикл ещё не завершён, пропускаем запуск")
+            return
+        with app.app_context():
+            configs = [
+                {"id": config.id, "user_id": config.user_id, "chat_id": config.chat_id, "product": config.product,
+                 "min_price": config.min_price, "max_price": config.max_price, "region": config.region}
+                for config in AutoParseConfig.query.join(User, User.id == AutoParseConfig.user_id).filter(AutoParseConfig.active.is_(True)).all()
+            ]
+            # Авто-парсинг открывает только новые карточки; поиск пользователя — все, чтобы показать совпадения.
+            # Фильтр строится один раз за цикл и только читается потоками тем
+            known = known_links_filter(Config.KNOWN_LINKS_FP_RATE) if configs else None
+        plans = group_configs(configs)
+        stats["configs"] = len(configs)
+        app.logger.info(f"Автопарсинг: {len(configs)} конфигураций, {len(plans)} уникальных тем")
+        with ThreadPoolExecutor(max_workers=Config.AUTO_PARSE_WORKERS, thread_name_prefix="auto-parse") as executor:
+            futures = [executor.submit(run_auto_parse_plan, plan, stats, known) for plan in plans]
+            for plan, future in zip(plans, futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    app.logger.error(f"Ошибка автопарсинга темы «{plan['product']}»: {e}")
+    app.logger.info(f"Автопарсинг: цикл завершён за {stats['duration']} с, новых заказов: {stats['new_jobs']}, ошибок: {stats['errors']}")
+    if stats["duration"] > Config.AUTO_PARSE_INTERVAL_MINUTES * 60:
+        app.logger.warning("Автопарсинг: цикл дольше интервала запуска")
+
+def deliver_telegram_outbox():
+    with app.app_context():
+        counts = telegram_sender.deliver_pending()
+        if any(counts.values()):
+            app.logger.info(f"Telegram: отправлено {counts['sent']}, повторов {counts['retry']}, ошибок {counts['failed']}, дублей {counts['skipped']}")
 
-scheduler.add_job(run_auto_parse, trigger=IntervalTrigger(minutes=10), id='auto_parse_job')
+# Периодические задания запускает отдельный процесс worker.py
 
 @app.route('/')
 def welcome():
@@ -188,27 +372,59 @@ def home():
 @app.route("/index")
 @login_required
 def index():
-    tasks = Job.query.filter_by(user_id=current_user.id, status="new").order_by(Job.budget.desc()).all()
+    tasks, next_cursor = job_list_page("index")
     auto_parse_config = AutoParseConfig.query.filter_by(user_id=current_user.id).first()
     return render_template(
         "index.html",
         telegram_id=current_user.telegram_id or "",
         background=get_unsplash_background(),
         tasks=tasks,
+        next_cursor=next_cursor,
         auto_parse_config=auto_parse_config
     )
 
 @app.route("/favorites")
 @login_required
 def favorites():
-    favorites_links = load_global_favorites()
-    tasks = Job.query.filter(Job.link.in_(favorites_links), Job.user_id == current_user.id).order_by(Job.budget.desc()).all()
-    return render_template("favorites.html", tasks=tasks, background=get_unsplash_background())
+    tasks, next_cursor = job_list_page("favorites")
+    return render_template("favorites.html", tasks=tasks, next_cursor=next_cursor, background=get_unsplash_background())
 
 @app.route("/simplify")
 def simplify_page():
     return render_template("simplify.html", background=get_unsplash_background())
 
+# Двухшаговая обработка запроса: исправление текста, затем составление ТЗ
+SIMPLIFY_CORRECTION = {"system": "Исправляй грамматические и стилистические ошибки в русском тексте.", "temperature": 0.3, "max_tokens": 500}
+SIMPLIFY_SPEC = {"system": "Составляй полное техническое задание (ТЗ) для исполнителя.", "temperature": 0.5, "max_tokens": 800}
+
+def simplify_request(step, text, stream=False):
+    return client.chat.completions.create(
+        model=Config.OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": step["system"]},
+            {"role": "user", "content": text}
+        ],
+        temperature=step["temperature"],
+        max_tokens=step["max_tokens"],
+        stream=stream
+    )
+
+def simplify_key(step, text):
+    return make_llm_key(Config.OPENAI_MODEL, step["system"], text, temperature=step["temperature"], max_tokens=step["max_tokens"])
+
+def simplify_cached(step, text, use_cache=True):
+    """Completion text for one step; with use_cache=False the cache is not read but the entry is refreshed."""
+    key = simplify_key(step, text)
+    cached = llm_cache.get(key) if use_cache else None
+    if cached is not None:
+        return cached
+    result = simplify_request(step, text).choices[0].message.content.strip()
+    llm_cache.set(key, result)
+    return result
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @app.route("/simplify_api", methods=["POST"])
 def simplify_api():
     data = request.get_json()
@@ -216,24 +432,9 @@ def simplify_api():
     if not query:
         return jsonify({"error": "No query provided"}), 400
     try:
-        correction = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "Исправляй грамматические и стилистические ошибки в русском тексте."},
-                {"role": "user", "content": query}
-            ],
-            temperature=0.3,
-            max_tokens=500
-        ).choices[0].message.content.strip()
-        task = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "Составляй полное техническое задание (ТЗ) для исполнителя."},
-                {"role": "user", "content": correction}
-            ],
-            temperature=0.5,
-            max_tokens=800
-        ).choices[0].message.content.strip()
+        use_cache = data.get("cache", True) is not False
+        correction = simplify_cached(SIMPLIFY_CORRECTION, query, use_cache)
+        task = simplify_cached(SIMPLIFY_SPEC, correction, use_cache)
         return jsonify([{
             "title": "Сформированное Техническое Задание",
             "description": task,
@@ -245,11 +446,51 @@ def simplify_api():
         app.logger.error(f"Ошибка OpenAI: {e}")
         return jsonify({"error": "Ошибка обработки запроса"}), 500
 
+@app.route("/simplify_api/stream", methods=["POST"])
+def simplify_api_stream():
+    """SSE variant of /simplify_api: a `correction` event, then `token` events of the specification, then `done`.
+
+    Both steps go through the LLM cache unless the body has "cache": false.
+    """
+    data = request.get_json(silent=True) or {}
+    query = data.get("query")
+    if not query:
+        return jsonify({"error": "No query provided"}), 400
+
+    use_cache = data.get("cache", True) is not False
+
+    def generate():
+        try:
+            correction = simplify_cached(SIMPLIFY_CORRECTION, query, use_cache)
+            yield sse_event("correction", {"text": correction})
+            key = simplify_key(SIMPLIFY_SPEC, correction)
+            cached = llm_cache.get(key) if use_cache else None
+            if cached is not None:
+                yield sse_event("token", {"text": cached})
+            else:
+                parts = []
+                for chunk in simplify_request(SIMPLIFY_SPEC, correction, stream=True):
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        parts.append(delta)
+                        yield sse_event("token", {"text": delta})
+                llm_cache.set(key, "".join(parts).strip())
+            yield sse_event("done", {})
+        except Exception as e:
+            app.logger.error(f"Ошибка OpenAI: {e}")
+            yield sse_event("error", {"error": "Ошибка обработки запроса"})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.route("/my_tasks")
 @login_required
 def my_tasks():
-    tasks = Job.query.filter(Job.user_id == current_user.id, Job.status == "in_progress").order_by(Job.budget.desc()).all()
-    return render_template("my_tasks.html", tasks=tasks, background=get_unsplash_background())
+    tasks, next_cursor = job_list_page("my_tasks")
+    return render_template("my_tasks.html", tasks=tasks, next_cursor=next_cursor, background=get_unsplash_background())
 
 @app.route("/admin_dashboard")
 @login_required
@@ -257,16 +498,37 @@ def admin_dashboard():
     if current_user.role != "admin":
         return redirect(url_for("index"))
     users = User.query.all()
-    analytics = [{"username": user.username, "taken": Job.query.filter(Job.user_id == user.id).count(), "done": Job.query.filter(Job.user_id == user.id, Job.status == "done").count()} for user in users]
-    jobs = Job.query.order_by(Job.id.desc()).all()
-    return render_template("admin_dashboard.html", background=get_unsplash_background(), users=users, analytics=analytics, online_users=list(online_users), jobs=jobs)
+    analytics = user_job_analytics()
+    jobs, next_cursor = job_list_page("admin")
+    return render_template("admin_dashboard.html", background=get_unsplash_background(), users=users, analytics=analytics, online_users=presence.online(), jobs=jobs, next_cursor=next_cursor)
+
+@app.route("/admin/auto_parse_stats")
+@login_required
+def auto_parse_stats():
+    if current_user.role != "admin":
+        return jsonify({"error": "Доступ запрещён"}), 403
+    # Автопарсинг идёт в процессе worker.py, который сохраняет статистику в файл
+    try:
+        with open(AUTO_PARSE_STATS_PATH, encoding="utf-8") as f:
+            return jsonify(json.load(f))
+    except (OSError, ValueError):
+        return jsonify(auto_parse_cycles.snapshot())
+
+@app.route("/admin/cache_stats")
+@login_required
+def cache_stats():
+    if current_user.role != "admin":
+        return jsonify({"error": "Доступ запрещён"}), 403
+    return jsonify({
+        "search": {"hits": search_cache.hits, "misses": search_cache.misses},
+        "llm": llm_cache.stats()
+    })
 
 @app.route("/tasks")
 @login_required
 def task_list():
-    show_free = request.args.get("free") == "1"
-    tasks = Job.query.filter_by(user_id=current_user.id, status="new").all() if show_free else Job.query.filter_by(user_id=current_user.id).order_by(Job.budget.desc()).all()
-    return render_template("tasks.html", tasks=tasks, background=get_unsplash_background())
+    tasks, next_cursor = job_list_page("tasks")
+    return render_template("tasks.html", tasks=tasks, next_cursor=next_cursor, background=get_unsplash_background())
 
 @app.route("/task/take/<int:job_id>")
 @login_required
@@ -277,6 +539,7 @@ def take_job(job_id):
         return redirect(url_for("tasks"))
     job.status = "in_progress"
     db.session.commit()
+    emit_job_event("job_taken", job, status=job.status)
     flash("✅ Задание успешно взято", "success")
     return redirect(url_for("my_tasks"))
 
@@ -285,12 +548,13 @@ def take_job(job_id):
 def complete_job(job_id):
     job = Job.query.get_or_404(job_id)
     if job.user_id != current_user.id:
-        return render_template("my_tasks.html", tasks=Job.query.filter(Job.user_id == current_user.id, Job.status == "in_progress").all(), background=get_unsplash_background(), error="Вы не назначены на это задание")
+        tasks, next_cursor = job_list_page("my_tasks")
+        return render_template("my_tasks.html", tasks=tasks, next_cursor=next_cursor, background=get_unsplash_background(), error="Вы не назначены на это задание")
     if job.status == "in_progress":
         job.status = "done"
         db.session.commit()
-        socketio.emit("task_completed", {"id": job.id, "title": job.title, "description": job.description})
-        socketio.emit("chat_message", {"msg": f"✅ {current_user.username} завершил задание: {job.title}", "time": datetime.now().strftime("%H:%M")})
+        emit_job_event("job_completed", job, status=job.status)
+        socketio.emit("chat_message", {"msg": f"✅ {current_user.username} завершил задание: {job.title}", "time": datetime.now().strftime("%H:%M")}, to=user_room(current_user.id))
     return redirect(url_for("my_tasks"))
 
 @app.route("/assign", methods=["POST"])
@@ -306,8 +570,70 @@ def assign_job():
     job.assigned_to = current_user.id
     job.status = "in_progress"
     db.session.commit()
+    emit_job_event("job_taken", job, status=job.status, assigned_to=job.assigned_to)
     return jsonify({"status": "assigned"})
 
+def job_to_dict(job):
+    return {"id": job.id, "title": job.title, "budget": job.budget or "Не указан", "description": job.description, "link": job.link}
+
+def run_search_source(search_id, user_id, source, topic, min_price, max_price, region):
+    with app.app_context():
+        count = 0
+        try:
+            key = make_key(source, topic, min_price, max_price, region)
+            records = search_cache.fetch(key, lambda: iter_parser(source, topic, min_price, max_price, region))
+            for batch in iter_batches(records):
+                matching = [job for job in batch if matches_filter(job, min_price, max_price, region)]
+                if not matching:
+                    continue
+                try:
+                    emit_jobs_ingested(user_id, ingest_jobs(matching, user_id))
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.warning(f"Поиск {search_id}: не удалось сохранить {len(matching)} заказов: {e}")
+                    continue
+                links = [job.get("link", "").strip() for job in matching]
+                found = [job_to_dict(row) for row in Job.query.filter(Job.link.in_(links), Job.user_id == user_id).all()]
+                if not found:
+                    continue
+                count += len(found)
+                searches.add_jobs(search_id, found)
+                socketio.emit("search_progress", {"search_id": search_id, "source": source, "status": "running", "jobs": found}, to=user_room(user_id))
+            app.logger.info(f"Поиск {search_id}: {source} вернул {count} заказов")
+        except Exception as e:
+            app.logger.error(f"Ошибка парсера {source} для поиска {search_id}: {e}")
+            finished = searches.source_done(search_id, source, error=f"Ошибка парсинга: {e}")
+            socketio.emit("search_progress", {"search_id": search_id, "source": source, "status": "error", "jobs": []}, to=user_room(user_id))
+        else:
+            finished = searches.source_done(search_id, source)
+            socketio.emit("search_progress", {"search_id": search_id, "source": source, "status": "done", "jobs": []}, to=user_room(user_id))
+        if finished:
+            socketio.emit("search_done", {"search_id": search_id, "status": searches.get(search_id)["status"]}, to=user_room(user_id))
+
+def run_search(search_id, user_id, topic, min_price, max_price, region):
+    searches.start(search_id)
+    # Под eventlet это green-потоки: ввод-вывод парсера и HTTP кооперативны, SQLite уходит в tpool (green.py);
+    # без патча — обычные потоки
+    for source in PARSERS:
+        socketio.start_background_task(run_search_source, search_id, user_id, source, topic, min_price, max_price, region)
+
+@app.route("/jobs/search")
+@login_required
+def jobs_search():
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "Пустой запрос"}), 400
+    limit = max(1, min(request.args.get("limit", PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    results = search_jobs(
+        query,
+        current_user.id,
+        min_price=request.args.get("min_price", type=float),
+        max_price=request.args.get("max_price", type=float),
+        status=request.args.get("status") or None,
+        limit=limit
+    )
+    return jsonify({"jobs": [{**job_list_item(job), "snippet": snippet} for job, snippet in results]})
+
 @app.route('/search', methods=['POST'])
 @login_required
 def search():
@@ -329,77 +655,116 @@ def search():
     if parts and parts[-1].isdigit():
         min_price = parts[-1]  # переопределим, если пользователь ввел через запрос
 
-    jobs = []
-    base_path = "C:/Users/Mane/Desktop/Python/freelance-monitor/results"
-    try:
-        def run_parser(script):
-            subprocess.run(["node", script, topic, min_price, max_price, region], check=True)
-
-        upwork_thread = Thread(target=run_parser, args=("C:/Users/Mane/Desktop/Python/freelance-monitor/parsers/puppeteer_upwork.js",))
-        guru_thread = Thread(target=run_parser, args=("C:/Users/Mane/Desktop/Python/freelance-monitor/parsers/puppeteer_guru.js",))
-        upwork_thread.start()
-        guru_thread.start()
-        upwork_thread.join()
-        guru_thread.join()
-
-        for filename in ["upwork.json", "guru.json"]:
-            full_path = os.path.join(base_path, filename)
-            if os.path.exists(full_path):
-                with open(full_path, encoding='utf-8') as f:
-                    file_jobs = json.load(f)
-                    app.logger.info(f"Загружено {len(file_jobs)} заказов из {filename}")
-                    jobs.extend(file_jobs)
-            else:
-                app.logger.warning(f"Файл {full_path} не найден")
-    except Exception as e:
-        app.logger.error(f"Ошибка парсеров: {e}")
-        return jsonify({"error": f"Ошибка парсинга: {str(e)}"}), 500
-
-    # Фильтрация и сохранение
-    for job in jobs:
-        budget = extract_budget(job)
-        job_region = job.get('region', '').lower()
-        if (min_price and budget < float(min_price)) or (max_price and budget > float(max_price)) or (region and region.lower() not in job_region):
-            continue
-        if job.get("description") and job.get("link") and not Job.query.filter_by(link=job['link']).first():
-            new_job = Job(
-                title=job.get("title", "Без названия"),
-                description=job.get("description", ""),
-                budget=job.get("budget", ""),
-                link=job.get("link"),
-                status="new",
-                user_id=current_user.id
-            )
-            db.session.add(new_job)
+    params = {"topic": topic, "min_price": min_price, "max_price": max_price, "region": region}
+    search_id = searches.create(current_user.id, params, PARSERS)
+    run_search(search_id, current_user.id, topic, min_price, max_price, region)
+    app.logger.info(f"Поиск {search_id} поставлен в очередь для пользователя {current_user.id}")
+    return jsonify({"search_id": search_id, "status": "pending", "status_url": url_for("search_status", search_id=search_id)}), 202
 
-    try:
-        db.session.commit()
-        app.logger.info("Новые заказы сохранены в базу данных")
-    except Exception as e:
-        app.logger.error(f"Ошибка сохранения в базу данных: {e}")
-        db.session.rollback()
-        return jsonify({"error": "Ошибка сохранения данных"}), 500
+@app.route('/search/<search_id>')
+@login_required
+def search_status(search_id):
+    item = searches.get(search_id)
+    if not item or item["user_id"] != current_user.id:
+        return jsonify({"error": "Поиск не найден"}), 404
+    offset = max(request.args.get("cursor", 0, type=int), 0)
+    limit = max(1, min(request.args.get("limit", PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    jobs = item["jobs"][offset:offset + limit]
+    return jsonify({
+        "search_id": search_id,
+        "status": item["status"],
+        "params": item["params"],
+        "sources": item["sources"],
+        "errors": item["errors"],
+        "total": len(item["jobs"]),
+        "jobs": [{**job, "description": job["description"][:300]} for job in jobs],
+        "next_cursor": offset + limit if offset + limit < len(item["jobs"]) else None
+    })
+
+@socketio.on("connect")
+def handle_connect(auth=None):
+    # Соединения без сессии Flask-Login отклоняются
+    if not current_user.is_authenticated:
+        return False
+    join_room(user_room(current_user.id))
+    if current_user.role == "admin":
+        join_room("admins")
+    if presence.connect(current_user.id, request.sid):
+        socketio.emit("presence", {"user_id": current_user.id, "online": True}, to="admins")
+
+@socketio.on("disconnect")
+def handle_disconnect(*args):
+    user_id = presence.disconnect(request.sid)
+    if user_id is not None:
+        socketio.emit("presence", {"user_id": user_id, "online": False}, to="admins")
+
+CHAT_ROOM_RE = re.compile(r"^[\w-]{1,50}$")
+
+def chat_room(value):
+    return value if isinstance(value, str) and CHAT_ROOM_RE.match(value) else DEFAULT_ROOM
+
+@socketio.on("join")
+def handle_join(data=None):
+    room = chat_room(data.get("room") if isinstance(data, dict) else data)
+    join_room(f"chat_{room}")
+    emit("chat history", {"room": room, "messages": chat_store.recent(room)})
+
+@socketio.on("send message")
+def handle_send_message(data):
+    # chat.js шлёт строку; объект {"room", "msg"} позволяет писать в другие комнаты
+    room, text = (chat_room(data.get("room")), data.get("msg")) if isinstance(data, dict) else (DEFAULT_ROOM, data)
+    text = str(text or "").strip()[:MAX_MESSAGE_LENGTH]
+    if not text:
+        return
+    message = chat_store.add(room, current_user.id, current_user.username, text)
+    socketio.emit("chat message", message, to=f"chat_{room}")
 
-    updated_jobs = [{"id": job.id, "title": job.title, "budget": job.budget or "Не указан", "description": job.description, "link": job.link} for job in Job.query.filter_by(user_id=current_user.id, status="new").order_by(Job.id.desc()).all()]
-    app.logger.info(f"Возвращено {len(updated_jobs)} заказов для пользователя {current_user.id}")
-    return jsonify(updated_jobs)
+@app.route("/chat/history")
+@login_required
+def chat_history():
+    """Older chat messages, newest first: ?room=&before=<ISO timestamp> for the first page, then ?cursor=."""
+    room = chat_room(request.args.get("room"))
+    limit = max(1, min(request.args.get("limit", PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    before = None
+    values = decode_cursor(request.args.get("cursor"))
+    try:
+        if values and len(values) == 2:
+            before = (datetime.fromisoformat(values[0]), int(values[1]))
+        elif request.args.get("before"):
+            before = (datetime.fromisoformat(request.args["before"]), 0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Некорректный курсор"}), 400
+    messages, next_before = chat_store.history(room, before=before, limit=limit)
+    next_cursor = encode_cursor([next_before[0].isoformat(), next_before[1]]) if next_before else None
+    return jsonify({"room": room, "messages": messages, "next_cursor": next_cursor})
 
 @app.route("/completions")
 @login_required
 def completions():
-    tasks = Job.query.filter(Job.user_id == current_user.id, Job.status == "done").order_by(Job.budget.desc()).all()
-    return render_template("completions.html", tasks=tasks, background=get_unsplash_background())
+    tasks, next_cursor = job_list_page("completions")
+    return render_template("completions.html", tasks=tasks, next_cursor=next_cursor, background=get_unsplash_background())
+
+@app.route("/api/jobs")
+@login_required
+def api_jobs():
+    view = request.args.get("view", "index")
+    if not job_list_query(view):
+        return jsonify({"error": "Список недоступен"}), 404
+    jobs, next_cursor = job_list_page(view)
+    return jsonify({"jobs": [job_list_item(job, full=view == "favorites") for job in jobs], "next_cursor": next_cursor})
 
 @app.route('/api/favorite', methods=['POST'])
+@login_required
 def api_favorite():
     data = request.get_json()
     job_id = data.get("job_id")
     if not job_id:
         return jsonify({"status": "error", "message": "ID задания не предоставлен"}), 400
-    favorites = load_global_favorites()
-    if job_id not in favorites:
-        favorites.append(job_id)
-        save_global_favorites(favorites)
+    # Принимаем как числовой ID, так и ссылку на заказ (старый формат)
+    job = db.session.get(Job, int(job_id)) if str(job_id).isdigit() else Job.query.filter_by(link=job_id).first()
+    if not job or job.user_id != current_user.id:
+        return jsonify({"status": "error", "message": "Задание не найдено или недоступно"}), 404
+    add_favorite(current_user.id, job.id)
     return jsonify({"status": "added"})
 
 @app.route("/logout")
@@ -467,12 +832,56 @@ def add_to_favorites():
     job = Job.query.filter_by(link=job_link).first()
     if not job or job.user_id != current_user.id:
         return jsonify({'error': 'Задание не найдено или недоступно'}), 404
-    favorites = load_global_favorites()
-    if job.link not in favorites:
-        favorites.append(job.link)
-        save_global_favorites(favorites)
+    add_favorite(current_user.id, job.id)
     return jsonify({'message': 'Добавлено в избранное'}), 200
 
+@app.cli.command("favorites-import")
+def favorites_import():
+    """Import the old global cache/favorites.json into the favorite table."""
+    with db.engine.begin() as connection:
+        inserted = import_favorites_json(connection, os.path.join(basedir, "cache", "favorites.json"))
+    print(f"Импортировано избранных: {inserted}")
+
+@app.cli.command("sqlite-bench")
+@click.option("--readers", default=8, help="Concurrent reader threads")
+@click.option("--seconds", default=5.0, help="Duration of each phase")
+@click.option("--user-id", type=int, default=None, help="Owner of the job list to read (first user by default)")
+def sqlite_bench(readers, seconds, user_id):
+    """Read latency of the job list alone and during a concurrent ingest writer."""
+    with app.app_context():
+        user_id = user_id or db.session.query(func.min(User.id)).scalar()
+        with db.engine.connect() as connection:
+            print("PRAGMA:", current_pragmas(connection, Config.SQLITE_PRAGMAS))
+    results = run_contention_benchmark(app, user_id, readers=readers, seconds=seconds)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+@app.cli.command("scrape-html")
+@click.argument("source", type=click.Choice(sorted(HTTP_SOURCES)))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--listing", is_flag=True, help="The file is a search results page")
+@click.option("--url", default=None, help="URL the page was saved from")
+def scrape_html(source, path, listing, url):
+    """Parse a saved HTML page with the HTTP scraper, without network access."""
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    if listing:
+        for link in parse_listing(source, html, url or HTTP_SOURCES[source]["search_url"]("")):
+            print(link)
+        return
+    card = parse_detail(source, html)
+    if card is None:
+        print("На странице нет <h1>: нужен браузер")
+        return
+    print(json.dumps(make_record(source, url or path, card), ensure_ascii=False, indent=2))
+
+@app.cli.command("fts-rebuild")
+def fts_rebuild():
+    """Rebuild the full-text index over all stored jobs."""
+    with db.engine.begin() as connection:
+        ensure_fts(connection)
+        rebuild_fts(connection)
+    print("Полнотекстовый индекс job_fts перестроен")
+
 if __name__ == "__main__":
     with app.app_context():
         db.create_all()
@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+UNSPLASH_RANDOM_URL = "https://api.unsplash.com/photos/random"
+TOPICS = ["freelance", "coding", "ai", "technology", "cyberpunk", "dark"]
+
+
+class BackgroundPool:
+    """Rotating in-memory pool of Unsplash background URLs.
+
+    refresh() is the only place that talks to Unsplash and runs from the
+    scheduler worker; pick() serves page renders from memory with no network
+    I/O. The pool is persisted to `path`, which web processes re-read when
+    the worker rewrites it (checked at most every `reload_interval` seconds).
+    """
+
+    def __init__(self, access_key, path, size=10, ttl=3600, timeout=10, reload_interval=60):
+        self.access_key = access_key
+        self.path = path
+        self.size = size
+        self.ttl = ttl
+        self.timeout = timeout
+        self._urls = []
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self.reload_interval = reload_interval
+        self._mtime = None
+        self._checked_at = time.monotonic()
+        self._load()
+
+    def _load(self):
+        try:
+            self._mtime = os.path.getmtime(self.path)
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Старый формат файла хранил один url
+        urls = data.get("urls") or ([data["url"]] if data.get("url") else [])
+        self._urls = urls[:self.size]
+        self._fetched_at = float(data.get("timestamp") or 0)
+
+    def _save(self, urls, fetched_at):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"timestamp": fetched_at, "urls": urls}, f, ensure_ascii=False, indent=2)
+            self._mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            logger.error(f"Ошибка сохранения фонов: {e}")
+
+    def fresh(self):
+        return bool(self._urls) and time.time() - self._fetched_at < self.ttl
+
+    def _reload_if_changed(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            changed = os.path.getmtime(self.path) != self._mtime
+        except OSError:
+            return
+        if changed:
+            self._load()
+
+    def pick(self, default):
+        """Return a random pooled URL, or `default` if the pool is empty or expired."""
+        with self._lock:
+            self._reload_if_changed()
+            if not self.fresh():
+                return default
+            return random.choice(self._urls)
+
+    def refresh(self):
+        """Fetch a new batch of URLs with one Unsplash request; keeps the old pool on failure."""
+        if not self.access_key:
+            return
+        params = {
+            "query": random.choice(TOPICS),
+            "orientation": "landscape",
+            "count": self.size,
+            "client_id": self.access_key,
+        }
+        try:
+            response = requests.get(UNSPLASH_RANDOM_URL, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            urls = [photo["urls"]["full"] for photo in response.json()]
+        except Exception as e:
+            logger.error(f"Ошибка запроса к Unsplash: {e}")
+            return
+        if not urls:
+            return
+        fetched_at = time.time()
+        with self._lock:
+            self._urls = urls[:self.size]
+            self._fetched_at = fetched_at
+            self._save(urls[:self.size], fetched_at)
+        logger.info(f"Обновлён пул фонов: {len(urls)} изображений")
@@ -0,0 +1,125 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import and_, insert, or_
+
+from users.models import db, ChatMessage, User
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOM = "general"
+MAX_MESSAGE_LENGTH = 1000
+
+
+def message_dict(room, user_id, username, text, timestamp):
+    return {
+        "room": room,
+        "user_id": user_id,
+        "user": username,
+        "msg": text,
+        "time": timestamp.strftime("%H:%M"),
+        "timestamp": timestamp.isoformat(),
+    }
+
+
+class ChatStore:
+    """Recent chat history in per-room ring buffers with batched persistence.
+
+    add() only touches memory and a queue; a background flusher writes
+    queued messages to chat_message with one multi-row INSERT per batch
+    (every `flush_interval` seconds or as soon as `batch_size` pile up).
+    """
+
+    def __init__(self, app, history_size=50, batch_size=100, flush_interval=1.0, spawn=None):
+        self.app = app
+        self.history_size = history_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._spawn = spawn or (lambda target: threading.Thread(target=target, daemon=True).start())
+        self._rooms = {}
+        self._pending = queue.Queue()
+        self._lock = threading.Lock()
+        self._flusher_started = False
+
+    def _buffer(self, room):
+        with self._lock:
+            buffer = self._rooms.get(room)
+        if buffer is not None:
+            return buffer
+        # Первое обращение к комнате после запуска — подгружаем хвост истории из БД до публикации буфера,
+        # чтобы add() не дописал новое сообщение раньше старых; если другой поток успел первым, берём его буфер
+        buffer = deque(reversed(self.history(room, limit=self.history_size)[0]), maxlen=self.history_size)
+        with self._lock:
+            return self._rooms.setdefault(room, buffer)
+
+    def recent(self, room):
+        return list(self._buffer(room))
+
+    def add(self, room, user_id, username, text):
+        message = message_dict(room, user_id, username, text, datetime.utcnow())
+        self._buffer(room).append(message)
+        self._pending.put((room, user_id, text, message["timestamp"]))
+        self._ensure_flusher()
+        return message
+
+    def _ensure_flusher(self):
+        with self._lock:
+            if self._flusher_started:
+                return
+            self._flusher_started = True
+        self._spawn(self._run_flusher)
+
+    def _run_flusher(self):
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def flush(self):
+        """Write everything queued so far (used at shutdown)."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._pending.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch):
+        rows = [{"room": room, "user_id": user_id, "message": text, "timestamp": datetime.fromisoformat(timestamp)}
+                for room, user_id, text, timestamp in batch]
+        with self.app.app_context():
+            try:
+                db.session.execute(insert(ChatMessage), rows)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Чат: не удалось сохранить {len(rows)} сообщений: {e}")
+
+    def history(self, room, before=None, limit=50):
+        """Messages of a room older than `before` ((timestamp, id) or None), newest first, and the next cursor."""
+        query = (db.session.query(ChatMessage.id, ChatMessage.room, ChatMessage.user_id, ChatMessage.message, ChatMessage.timestamp, User.username)
+                 .join(User, User.id == ChatMessage.user_id)
+                 .filter(ChatMessage.room == room))
+        if before:
+            timestamp, message_id = before
+            query = query.filter(or_(ChatMessage.timestamp < timestamp, and_(ChatMessage.timestamp == timestamp, ChatMessage.id < message_id)))
+        rows = query.order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc()).limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1].timestamp, rows[-1].id)
+        return [message_dict(row.room, row.user_id, row.username, row.message, row.timestamp) for row in rows], next_cursor
@@ -5,9 +5,71 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', os.urandom(32).hex())
     SQLALCHEMY_DATABASE_URI = f'sqlite:///{Path(__file__).parent / "db.sqlite3"}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Профиль SQLite: PRAGMA выполняются на каждом новом соединении (sqlite_profile.py)
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'cache_size': -int(os.getenv('SQLITE_CACHE_KB', 32768)),  # отрицательное значение — размер в КиБ
+        'mmap_size': int(os.getenv('SQLITE_MMAP_BYTES', 256 * 1024 * 1024)),
+        'temp_store': 'MEMORY',
+        'foreign_keys': os.getenv('SQLITE_FOREIGN_KEYS', 'ON'),
+    }
+    # Запросы, планировщик и потоки поиска работают параллельно — нужен пул соединений
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('SQLITE_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('SQLITE_MAX_OVERFLOW', 10)),
+        'pool_timeout': 30,
+        # Ожидание блокировки задаёт только PRAGMA busy_timeout из SQLITE_PRAGMAS: она выполняется после
+        # подключения и всё равно перекрыла бы timeout драйвера
+        'connect_args': {'check_same_thread': False},
+    }
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    # Можно указать OpenAI-совместимый сервер (например, локальную заглушку)
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL') or None
+    OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 1000))
     UNSPLASH_ACCESS_KEY = os.getenv('UNSPLASH_ACCESS_KEY')
     TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
-    CACHE_PATH = 'cache/search_cache.json'
+    # Базовый URL Bot API (можно указать локальную заглушку) и лимиты отправки
+    TELEGRAM_API_BASE = os.getenv('TELEGRAM_API_BASE', 'https://api.telegram.org')
+    TELEGRAM_PER_SECOND = int(os.getenv('TELEGRAM_PER_SECOND', 25))
+    TELEGRAM_CHAT_INTERVAL = float(os.getenv('TELEGRAM_CHAT_INTERVAL', 1.0))
+    TELEGRAM_OUTBOX_INTERVAL_SECONDS = int(os.getenv('TELEGRAM_OUTBOX_INTERVAL_SECONDS', 5))
     CACHE_EXPIRATION = 300
+    CACHE_MAX_ENTRIES = 500
+    AUTO_PARSE_INTERVAL_MINUTES = int(os.getenv('AUTO_PARSE_INTERVAL_MINUTES', 10))
+    AUTO_PARSE_WORKERS = int(os.getenv('AUTO_PARSE_WORKERS', 4))
+    # puppeteer — всегда браузер; http — сначала обычные HTTP-запросы (http_scraper.py), Puppeteer только
+    # для страниц, которым нужен JS. По умолчанию браузер, пока HTTP-путь не проверен на живых сайтах;
+    # включается SCRAPER_ENGINE=http
+    SCRAPER_ENGINE = os.getenv('SCRAPER_ENGINE', 'puppeteer')
+    HTTP_SCRAPER_TIMEOUT = int(os.getenv('HTTP_SCRAPER_TIMEOUT', 20))
+    # Боевой режим парсеров: без окна браузера, без картинок/шрифтов/стилей, ожидания по событиям.
+    # PARSER_PRODUCTION=0 — видимый браузер с прежними паузами для отладки
+    PARSER_PRODUCTION = os.getenv('PARSER_PRODUCTION', '1') == '1'
+    # Доля ложных срабатываний фильтра известных ссылок (новая карточка принята за известную)
+    KNOWN_LINKS_FP_RATE = float(os.getenv('KNOWN_LINKS_FP_RATE', 0.001))
+    # Срок аренды лидерства планировщика (с); продлевается каждую треть срока
+    SCHEDULER_LEASE_TTL = int(os.getenv('SCHEDULER_LEASE_TTL', 60))
+    # Ограничения на источник: одновременных парсингов и запусков в минуту
+    SOURCE_LIMITS = {
+        'upwork': {'concurrency': int(os.getenv('UPWORK_CONCURRENCY', 2)), 'per_minute': int(os.getenv('UPWORK_PER_MINUTE', 6))},
+        'guru': {'concurrency': int(os.getenv('GURU_CONCURRENCY', 2)), 'per_minute': int(os.getenv('GURU_PER_MINUTE', 6))},
+    }
+    # Сколько карточек источника парсер читает параллельно (вкладок на один парсинг)
+    DETAIL_CONCURRENCY = {
+        'upwork': int(os.getenv('UPWORK_DETAIL_CONCURRENCY', 4)),
+        'guru': int(os.getenv('GURU_DETAIL_CONCURRENCY', 4)),
+    }
+    # Пул фоновых изображений Unsplash: размер, срок жизни (с) и период обновления
+    BACKGROUND_POOL_SIZE = int(os.getenv('BACKGROUND_POOL_SIZE', 10))
+    BACKGROUND_TTL = int(os.getenv('BACKGROUND_TTL', 6 * 3600))
+    BACKGROUND_REFRESH_MINUTES = int(os.getenv('BACKGROUND_REFRESH_MINUTES', 60))
+    # Чат: сообщений в памяти на комнату, размер пачки записи в БД и период сброса (с)
+    CHAT_HISTORY_SIZE = int(os.getenv('CHAT_HISTORY_SIZE', 50))
+    CHAT_BATCH_SIZE = int(os.getenv('CHAT_BATCH_SIZE', 100))
+    CHAT_FLUSH_INTERVAL = float(os.getenv('CHAT_FLUSH_INTERVAL', 1.0))
+    # URL брокера (например, redis://) для событий SocketIO из процесса worker.py
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE') or None
     DEBUG = os.getenv('FLASK_ENV') == 'development'
\ No newline at end of file
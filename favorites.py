@@ -0,0 +1,44 @@
+import json
+import logging
+import os
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from users.models import db, Favorite, Job
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 500
+
+
+def add_favorite(user_id, job_id):
+    """Insert one favorite row; returns False if the job was already a favorite of the user."""
+    stmt = sqlite_insert(Favorite).values(user_id=user_id, job_id=job_id).on_conflict_do_nothing(index_elements=["user_id", "job_id"])
+    added = db.session.execute(stmt).rowcount > 0
+    db.session.commit()
+    return added
+
+
+def import_favorites_json(connection, path):
+    """One-time import of the old global cache/favorites.json (a list of job links).
+
+    The file was not per user, so every link becomes a favorite of the job's
+    owner, which is what the old /favorites page showed. Returns the number
+    of inserted rows; links without a stored job are skipped.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, encoding="utf-8") as f:
+        links = [link for link in json.load(f) if isinstance(link, str)]
+    inserted = 0
+    jobs = Job.__table__
+    for start in range(0, len(links), IMPORT_BATCH_SIZE):
+        batch = links[start:start + IMPORT_BATCH_SIZE]
+        rows = [{"user_id": user_id, "job_id": job_id}
+                for job_id, user_id in connection.execute(select(jobs.c.id, jobs.c.user_id).where(jobs.c.link.in_(batch)))]
+        if rows:
+            stmt = sqlite_insert(Favorite.__table__).values(rows).on_conflict_do_nothing(index_elements=["user_id", "job_id"])
+            inserted += connection.execute(stmt).rowcount
+    logger.info(f"Импортировано {inserted} избранных из {path} ({len(links)} ссылок)")
+    return inserted
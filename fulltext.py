@@ -0,0 +1,77 @@
+import logging
+import re
+
+from sqlalchemy import text
+from sqlalchemy.orm import defer, undefer
+
+from users.models import db, Job
+
+logger = logging.getLogger(__name__)
+
+# Внешний контент-индекс FTS5 поверх таблицы job; триггеры держат его в синхроне
+FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS job_fts USING fts5(
+        title, description,
+        content='job', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS job_fts_ai AFTER INSERT ON job BEGIN
+        INSERT INTO job_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS job_fts_ad AFTER DELETE ON job BEGIN
+        INSERT INTO job_fts(job_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS job_fts_au AFTER UPDATE OF title, description ON job BEGIN
+        INSERT INTO job_fts(job_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO job_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def ensure_fts(connection):
+    """Create the FTS table and triggers if missing; rebuild the index when the table is new."""
+    exists = connection.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_fts'")).first()
+    for statement in FTS_DDL:
+        connection.execute(text(statement))
+    if not exists:
+        rebuild_fts(connection)
+        logger.info("Создан полнотекстовый индекс job_fts")
+
+
+def rebuild_fts(connection):
+    """Re-index every stored job (backfill)."""
+    connection.execute(text("INSERT INTO job_fts(job_fts) VALUES ('rebuild')"))
+
+
+def build_match_query(query):
+    """Turn free user input into a safe FTS5 MATCH expression (prefix match on every word)."""
+    tokens = TOKEN_RE.findall(query.lower())
+    return " ".join(f'"{token}"*' for token in tokens[:10])
+
+
+def search_jobs(query, user_id, min_price=None, max_price=None, status=None, limit=30):
+    """Return (job, snippet) pairs for user_id ranked by bm25, title weighted above description."""
+    match = build_match_query(query)
+    if not match:
+        return []
+    sql = """
+        SELECT job.id AS id, snippet(job_fts, 1, '', '', '…', 24) AS snippet
+        FROM job_fts JOIN job ON job.id = job_fts.rowid
+        WHERE job_fts MATCH :match AND job.user_id = :user_id
+    """
+    params = {"match": match, "user_id": user_id, "limit": limit}
+    if status:
+        sql += " AND job.status = :status"
+        params["status"] = status
+    if min_price is not None:
+        sql += " AND job.budget_max >= :min_price"
+        params["min_price"] = min_price
+    if max_price is not None:
+        sql += " AND job.budget_min <= :max_price"
+        params["max_price"] = max_price
+    sql += " ORDER BY bm25(job_fts, 5.0, 1.0) LIMIT :limit"
+    rows = db.session.execute(text(sql), params).all()
+    jobs = {job.id: job for job in Job.query.options(defer(Job.description), undefer(Job.description_preview)).filter(Job.id.in_([row.id for row in rows])).all()}
+    return [(jobs[row.id], row.snippet) for row in rows if row.id in jobs]
@@ -0,0 +1,27 @@
+import sqlite3
+import sys
+
+
+def eventlet_patched():
+    """True when running under eventlet with the standard library monkey-patched (gunicorn -k eventlet)."""
+    eventlet = sys.modules.get("eventlet")
+    return bool(eventlet) and eventlet.patcher.is_monkey_patched("socket")
+
+
+def sqlite_engine_options(database, options):
+    """Engine options for a SQLite file; under eventlet every sqlite3 call runs in eventlet's OS thread pool.
+
+    sqlite3 is a C extension: a query or a busy_timeout wait on a write lock
+    held by the scheduler worker would otherwise freeze the whole green hub,
+    and with it every HTTP request and SocketIO connection of the process.
+    """
+    if not eventlet_patched():
+        return options
+    from eventlet import tpool
+
+    connect_args = dict(options.get("connect_args", {}))
+
+    def creator():
+        return tpool.Proxy(sqlite3.connect(database, **connect_args), autowrap=(sqlite3.Cursor,))
+
+    return {**{key: value for key, value in options.items() if key != "connect_args"}, "creator": creator}
@@ -0,0 +1,266 @@
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urljoin
+
+import lxml.html
+import requests
+from lxml import etree
+from lxml.cssselect import CSSSelector
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from known_links import BloomFilter, link_key
+
+logger = logging.getLogger(__name__)
+
+# Тот же браузерный User-Agent, что и у Puppeteer-парсеров (parsers/sources.js)
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+# Ответы, после которых страницу стоит открыть браузером: защита от ботов или лимит запросов
+BLOCKED_STATUSES = {401, 403, 429, 503}
+BUDGET_RE = re.compile(r"\$\s*([\d,.]+)")
+# Страница со скриптами и почти без видимого текста — оболочка SPA, её содержимое рисует JS
+JS_SHELL_TEXT_LIMIT = 200
+# Текст, который браузер показал бы в innerText: без скриптов, стилей и <head>
+VISIBLE_TEXT = etree.XPath("descendant-or-self::text()[not(ancestor::script or ancestor::style or ancestor::noscript "
+                           "or ancestor::template or ancestor::head)]")
+
+
+class NeedsBrowser(Exception):
+    """Raised when some pages could not be read over plain HTTP.
+
+    `known` is the caller's known-links filter extended with the links this
+    run already handled, so the Puppeteer fallback only opens the rest.
+    """
+
+    def __init__(self, message, known):
+        super().__init__(message)
+        self.known = known
+
+
+def parse_html(html):
+    """lxml document for a page; an empty response gives an empty document."""
+    try:
+        return lxml.html.document_fromstring(html)
+    except etree.ParserError:
+        return lxml.html.document_fromstring("<html><body></body></html>")
+
+
+def inner_text(node):
+    """Visible text with whitespace collapsed, close to the browser's innerText."""
+    return " ".join(" ".join(VISIBLE_TEXT(node)).split())
+
+
+def _first(selector, root):
+    found = selector(root)
+    return found[0] if found else None
+
+
+UPWORK_REGION = CSSSelector('li[data-qa="client-location"] strong')
+GURU_REGION = CSSSelector('div.jobLocations[title*="Preferred Locations"]')
+
+
+def _upwork_region(root):
+    node = _first(UPWORK_REGION, root)
+    return inner_text(node) if node is not None else None
+
+
+def _guru_region(root):
+    node = _first(GURU_REGION, root)
+    return node.get("title").replace("Preferred Locations: ", "") if node is not None else None
+
+
+# Те же селекторы, что в SOURCES из parsers/sources.js
+SOURCES = {
+    "upwork": {
+        "name": "Upwork",
+        "cookies_file": "upwork_cookies.json",
+        "search_url": lambda topic: f"https://www.upwork.com/nx/jobs/search/?q={quote(topic, safe='')}",
+        "links": CSSSelector('a[data-test="job-tile-title-link UpLink"]'),
+        "region": _upwork_region,
+    },
+    "guru": {
+        "name": "Guru",
+        "cookies_file": "guru_cookies.json",
+        "search_url": lambda topic: f"https://www.guru.com/d/jobs/q/{quote(topic, safe='')}/",
+        "links": CSSSelector("a.jobTitle"),
+        "region": _guru_region,
+    },
+}
+
+
+def _listing_links(source, root, url):
+    links = (urljoin(url, node.get("href")) for node in SOURCES[source]["links"](root) if node.get("href"))
+    return list(dict.fromkeys(links))
+
+
+def parse_listing(source, html, url):
+    """Absolute detail links of a listing page, deduplicated in page order."""
+    return _listing_links(source, parse_html(html), url)
+
+
+def _body(root):
+    body = root.find("body")
+    return root if body is None else body
+
+
+def is_js_shell(root):
+    """True for a page whose content is rendered by scripts: it has <script> but next to no visible text."""
+    return bool(root.xpath("//script")) and len(inner_text(_body(root))) < JS_SHELL_TEXT_LIMIT
+
+
+def first_dollar_amount(text):
+    """Number after the first `$`, parsed like parseBudget() in parsers/sources.js."""
+    match = BUDGET_RE.search(text or "")
+    number = re.match(r"\d+(?:\.\d+)?", match.group(1).replace(",", "")) if match else None
+    return float(number.group()) if number else None
+
+
+def parse_detail(source, html):
+    """Fields of a detail page, or None if it has no <h1> (rendered by JS)."""
+    root = parse_html(html)
+    heading = root.find(".//h1")
+    if heading is None:
+        return None
+    return {
+        "title": inner_text(heading) or "Без названия",
+        "description": "\n".join(inner_text(node) for node in root.iter("p")) or "Нет описания",
+        "price": first_dollar_amount(inner_text(_body(root))),
+        "region": SOURCES[source]["region"](root) or "Не указан",
+    }
+
+
+def _format_price(price):
+    return f"${int(price)}" if price.is_integer() else f"${price}"
+
+
+def _as_int(value, default):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def make_record(source, link, card, min_price=0, max_price=None, region=""):
+    """Job record in the parsers' shape, or None if the card is outside the filter."""
+    min_price = _as_int(min_price, 0)
+    max_price = _as_int(max_price, None) or float("inf")
+    region = (region or "").lower()
+    if region and region not in card["region"].lower():
+        return None
+    price = card["price"]
+    if price is not None and not min_price <= price <= max_price:
+        return None
+    return {
+        "title": f"{SOURCES[source]['name']}: {card['title']}",
+        "budget": "неизвестно" if price is None else _format_price(price),
+        "description": card["description"],
+        "link": link,
+        "region": card["region"],
+    }
+
+
+class HttpScraper:
+    """Listing and detail pages over one pooled keep-alive session per source.
+
+    Yields records in the same shape and order as the Puppeteer parsers.
+    Pages that are blocked or rendered by JS are left for the browser: the
+    run ends with NeedsBrowser, whose `known` filter covers everything that
+    was already handled here.
+    """
+
+    def __init__(self, cookies_dir=None, timeout=20, pool_size=8, retries=2):
+        self.cookies_dir = cookies_dir
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.retries = retries
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session(self, source):
+        with self._lock:
+            return self._sessions.get(source) or self._new_session(source)
+
+    def _new_session(self, source):
+        session = requests.Session()
+        retry = Retry(total=self.retries, backoff_factor=0.5, status_forcelist=(500, 502, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.pool_size, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"})
+        self._load_cookies(session, source)
+        self._sessions[source] = session
+        return session
+
+    def _load_cookies(self, session, source):
+        # Cookies, сохранённые save_*_cookies.js в формате Puppeteer
+        if not self.cookies_dir:
+            return
+        path = os.path.join(self.cookies_dir, SOURCES[source]["cookies_file"])
+        try:
+            with open(path, encoding="utf-8") as f:
+                cookies = json.load(f)
+        except (OSError, ValueError):
+            return
+        for cookie in cookies:
+            session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+
+    def fetch(self, source, url):
+        """Page HTML, or None if the site blocked the request."""
+        response = self.session(source).get(url, timeout=self.timeout)
+        if response.status_code in BLOCKED_STATUSES:
+            logger.warning(f"{SOURCES[source]['name']}: {url} вернул {response.status_code}")
+            return None
+        response.raise_for_status()
+        return response.text
+
+    def _read_card(self, source, link):
+        """(card, needs_browser) for one link; other failures only skip this card."""
+        try:
+            html = self.fetch(source, link)
+        except requests.RequestException as e:
+            logger.warning(f"⚠️ Ошибка карточки: {link} — {e}")
+            return None, False
+        card = parse_detail(source, html) if html is not None else None
+        return card, card is None
+
+    def scrape_iter(self, source, topic, min_price=0, max_price=None, region="", known=None, concurrency=1):
+        name = SOURCES[source]["name"]
+        url = SOURCES[source]["search_url"](topic.lower())
+        html = self.fetch(source, url)
+        if html is None:
+            raise NeedsBrowser(f"{name}: список заказов заблокирован для HTTP-запросов", known)
+        root = parse_html(html)
+        links = _listing_links(source, root, url)
+        if not links:
+            if is_js_shell(root):
+                raise NeedsBrowser(f"{name}: список заказов рисуется скриптами", known)
+            # Настоящая пустая выдача: браузер нашёл бы то же самое
+            logger.info(f"🔗 {name}: по запросу «{topic}» заказов нет")
+            return
+        fresh = [link for link in links if known is None or link_key(link) not in known]
+        logger.info(f"🔗 {name}: найдено ссылок {len(links)}, новых {len(fresh)}")
+
+        handled, deferred = [], 0
+        # map() отдаёт результаты в порядке ссылок, как и Puppeteer-парсер
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(fresh) or 1))) as pool:
+            for link, (card, needs_browser) in zip(fresh, pool.map(lambda link: self._read_card(source, link), fresh)):
+                if needs_browser:
+                    deferred += 1
+                    continue
+                handled.append(link)
+                record = make_record(source, link, card, min_price, max_price, region) if card else None
+                if record:
+                    yield record
+        if deferred:
+            raise NeedsBrowser(f"{name}: {deferred} карточек требуют браузера", _extend_known(known, handled))
+
+
+def _extend_known(known, links):
+    extended = BloomFilter(len(links)) if known is None else known.copy()
+    for link in links:
+        extended.add(link_key(link))
+    return extended
@@ -0,0 +1,140 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import nullcontext
+
+from flask import current_app, has_app_context
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import undefer
+
+from telegram_outbox import enqueue
+from users.models import db, Job
+from utils import parse_budget
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 150
+
+
+def normalize_record(record):
+    """Return a Job row dict for a scraped record, or None if it cannot be stored."""
+    link = (record.get("link") or "").strip()
+    description = record.get("description") or ""
+    if not link or not description.strip():
+        return None
+    budget_min, budget_max, budget_kind = parse_budget(record.get("budget"))
+    return {
+        "title": (record.get("title") or "Без названия")[:255],
+        "description": description,
+        "budget": (record.get("budget") or "")[:50],
+        "link": link[:255],
+        "budget_min": budget_min,
+        "budget_max": budget_max,
+        "budget_kind": budget_kind,
+    }
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def ingest_jobs(records, user_id, notify=None):
+    """Store scraped records for user_id, skipping links that already exist.
+
+    Existing links are found with one IN query per batch, new rows are
+    inserted with INSERT ... ON CONFLICT(link) DO NOTHING so a concurrent
+    ingest of the same link is not an error. If `notify(record)` is given
+    it returns (chat_id, text) and a Telegram outbox row is written for
+    every new job in the same transaction. Returns the newly created
+    Job rows in input order.
+    """
+    rows = {}
+    sources = {}
+    for record in records:
+        row = normalize_record(record)
+        if row and row["link"] not in rows:
+            rows[row["link"]] = row
+            sources[row["link"]] = record
+    if not rows:
+        return []
+
+    new_ids = []
+    for batch in _chunks(list(rows.values()), BATCH_SIZE):
+        links = [row["link"] for row in batch]
+        existing = set(db.session.scalars(select(Job.link).where(Job.link.in_(links))))
+        fresh = [{**row, "status": "new", "user_id": user_id} for row in batch if row["link"] not in existing]
+        if not fresh:
+            continue
+        stmt = sqlite_insert(Job).values(fresh).on_conflict_do_nothing(index_elements=["link"]).returning(Job.id, Job.link)
+        for job_id, link in db.session.execute(stmt):
+            new_ids.append(job_id)
+            if notify:
+                chat_id, text = notify(sources[link])
+                enqueue(chat_id, text, user_id=user_id, job_url=link)
+    db.session.commit()
+    if not new_ids:
+        return []
+    created = {job.link: job for job in Job.query.options(undefer(Job.description_preview)).filter(Job.id.in_(new_ids)).all()}
+    logger.info(f"Сохранено {len(created)} новых заказов из {len(rows)} для пользователя {user_id}")
+    return [created[link] for link in rows if link in created]
+
+
+def _pump(records, pending, stop, app):
+    """Move records from the source iterator to `pending`; the iterator may need the caller's app (search cache)."""
+    with app.app_context() if app else nullcontext():
+        try:
+            for record in records:
+                if stop.is_set():
+                    break
+                pending.put(("record", record))
+        except Exception as e:
+            pending.put(("error", e))
+        finally:
+            # Потребитель бросил поток — останавливаем парсер, а не дочитываем его впустую
+            if stop.is_set() and hasattr(records, "close"):
+                records.close()
+            pending.put(("done", None))
+
+
+def iter_batches(records, size=BATCH_SIZE, max_gap=0.05):
+    """Group a record stream into batches for ingest_jobs.
+
+    The first record of a batch opens a `max_gap`-second window: records
+    that arrive within it (cache replays, a burst after a slow card) are
+    collected up to `size`, and the batch is flushed when the window
+    closes even if the source goes quiet. A source error is re-raised
+    after the records read before it.
+    """
+    pending = queue.Queue()
+    stop = threading.Event()
+    app = current_app._get_current_object() if has_app_context() else None
+    threading.Thread(target=_pump, args=(records, pending, stop, app), daemon=True).start()
+    try:
+        while True:
+            kind, value = pending.get()
+            if kind != "record":
+                break
+            batch = [value]
+            deadline = time.monotonic() + max_gap
+            while len(batch) < size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    kind, value = pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if kind != "record":
+                    break
+                batch.append(value)
+            yield batch
+            if kind != "record":
+                break
+        if kind == "error":
+            raise value
+    finally:
+        stop.set()
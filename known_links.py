@@ -0,0 +1,57 @@
+import base64
+import hashlib
+import math
+
+from sqlalchemy import select
+
+from users.models import db, Job
+
+
+def link_key(link):
+    """Link without query string and fragment; the same rule is in parsers/sources.js."""
+    return link.split("#", 1)[0].split("?", 1)[0].strip()
+
+
+class BloomFilter:
+    """Bit array with k double-hashed SHA-1 probes, readable by parsers/sources.js."""
+
+    def __init__(self, capacity, fp_rate=0.001):
+        capacity = max(capacity, 1)
+        self.m = max(1024, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.k = min(16, max(1, round(self.m / capacity * math.log(2))))
+        self.bits = bytearray((self.m + 7) // 8)
+
+    def _indexes(self, key):
+        digest = hashlib.sha1(key.encode("utf-8")).digest()
+        h1 = int.from_bytes(digest[0:4], "big")
+        h2 = int.from_bytes(digest[4:8], "big") | 1
+        return ((h1 + i * h2) % self.m for i in range(self.k))
+
+    def add(self, key):
+        for index in self._indexes(key):
+            self.bits[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(key))
+
+    def copy(self):
+        clone = BloomFilter.__new__(BloomFilter)
+        clone.m, clone.k, clone.bits = self.m, self.k, bytearray(self.bits)
+        return clone
+
+    def to_dict(self):
+        return {"m": self.m, "k": self.k, "bits": base64.b64encode(bytes(self.bits)).decode("ascii")}
+
+
+def known_links_filter(fp_rate=0.001):
+    """Bloom filter over the links of all stored jobs (job.link is unique across users).
+
+    A false positive makes the parser skip a new card, so `fp_rate` bounds
+    the share of new jobs a cycle can miss; the filter is resized as the
+    table grows, so a miss rarely repeats.
+    """
+    links = db.session.execute(select(Job.link)).scalars().all()
+    known = BloomFilter(len(links), fp_rate)
+    for link in links:
+        known.add(link_key(link))
+    return known
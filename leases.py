@@ -0,0 +1,86 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from functools import wraps
+
+from sqlalchemy import or_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from users.models import db, SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+
+class Lease:
+    """Leader lease stored in the scheduler_lease table.
+
+    renew() takes over a missing or expired lease (or extends our own) with
+    a single conditional UPDATE/INSERT, so only one process holds it at a
+    time. Jobs wrapped with guard() run only while the lease is held; the
+    local deadline is a little shorter than the one in the database so a
+    stalled holder stops before another worker can take over.
+    """
+
+    def __init__(self, name, ttl=60, owner=None):
+        self.name = name
+        self.ttl = ttl
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._valid_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def held(self):
+        return time.monotonic() < self._valid_until
+
+    def renew(self):
+        """Acquire or extend the lease; must run inside an app context. Returns True if held."""
+        started = time.monotonic()
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        try:
+            acquired = db.session.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name, or_(SchedulerLease.owner == self.owner, SchedulerLease.expires_at < now))
+                .values(owner=self.owner, expires_at=expires_at)
+            ).rowcount > 0
+            if not acquired:
+                acquired = db.session.execute(
+                    sqlite_insert(SchedulerLease)
+                    .values(name=self.name, owner=self.owner, expires_at=expires_at)
+                    .on_conflict_do_nothing(index_elements=["name"])
+                ).rowcount > 0
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Аренда {self.name}: ошибка продления: {e}")
+            acquired = False
+        with self._lock:
+            was_held = self.held
+            self._valid_until = started + self.ttl * 0.8 if acquired else 0.0
+        if acquired and not was_held:
+            logger.info(f"Аренда {self.name}: процесс {self.owner} стал ведущим")
+        elif was_held and not acquired:
+            logger.warning(f"Аренда {self.name}: лидерство потеряно")
+        return acquired
+
+    def release(self):
+        self._valid_until = 0.0
+        try:
+            SchedulerLease.query.filter_by(name=self.name, owner=self.owner).delete()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Аренда {self.name}: ошибка освобождения: {e}")
+
+    def guard(self, func):
+        """Wrap a scheduled job so it is skipped unless this process holds the lease."""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.held:
+                return None
+            return func(*args, **kwargs)
+        return wrapper
@@ -0,0 +1,61 @@
+import hashlib
+import json
+import logging
+from datetime import datetime
+
+from users.models import db, LLMCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+def make_llm_key(model, system, text, **params):
+    """Content address of one completion: sha256 of model, system prompt, normalized input and parameters."""
+    normalized = " ".join(str(text or "").split())
+    payload = json.dumps([model, system, normalized, params], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Persistent LRU cache of LLM responses in the llm_cache_entry table, bounded by entry count."""
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = LLMCacheEntry.query.filter_by(key=key).first()
+        if not entry:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry.accessed_at = datetime.utcnow()
+        db.session.commit()
+        return entry.response
+
+    def set(self, key, response):
+        if not response:
+            return
+        try:
+            now = datetime.utcnow()
+            entry = LLMCacheEntry.query.filter_by(key=key).first() or LLMCacheEntry(key=key)
+            entry.response = response
+            entry.created_at = now
+            entry.accessed_at = now
+            db.session.add(entry)
+            db.session.flush()
+            self._evict()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Кэш LLM: не удалось сохранить ответ: {e}")
+
+    def _evict(self):
+        overflow = LLMCacheEntry.query.count() - self.max_entries
+        if overflow > 0:
+            oldest = db.session.query(LLMCacheEntry.id).order_by(LLMCacheEntry.accessed_at.asc()).limit(overflow)
+            LLMCacheEntry.query.filter(LLMCacheEntry.id.in_(oldest.scalar_subquery())).delete(synchronize_session=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / total, 3) if total else None}
@@ -97,14 +97,25 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        # batch_alter_table пересоздаёт таблицы — на время миграций внешние ключи выключаем
+        sqlite = connection.dialect.name == 'sqlite'
+        if sqlite:
+            foreign_keys = connection.exec_driver_sql('PRAGMA foreign_keys').scalar()
+            connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+            connection.commit()
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
             **conf_args
         )
 
-        with context.begin_transaction():
-            context.run_migrations()
+        try:
+            with context.begin_transaction():
+                context.run_migrations()
+        finally:
+            if sqlite:
+                connection.exec_driver_sql(f'PRAGMA foreign_keys={foreign_keys}')
+                connection.commit()
 
 
 if context.is_offline_mode():
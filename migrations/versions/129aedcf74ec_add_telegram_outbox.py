@@ -0,0 +1,45 @@
+"""Add telegram_outbox table
+
+Revision ID: 129aedcf74ec
+Revises: 377e1d5ba628
+Create Date: 2026-10-18 15:21:09.301846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '129aedcf74ec'
+down_revision = '377e1d5ba628'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Таблица может уже существовать: app.py вызывает db.create_all() при импорте
+    if sa.inspect(op.get_bind()).has_table('telegram_outbox'):
+        return
+    op.create_table(
+        'telegram_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('chat_id', sa.String(length=50), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('job_url', sa.String(length=300), nullable=True),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=10), server_default='pending', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('last_error', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('telegram_outbox', schema=None) as batch_op:
+        batch_op.create_index('ix_telegram_outbox_status_next', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('telegram_outbox', schema=None) as batch_op:
+        batch_op.drop_index('ix_telegram_outbox_status_next')
+    op.drop_table('telegram_outbox')
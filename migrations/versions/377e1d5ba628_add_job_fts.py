@@ -0,0 +1,29 @@
+"""Add FTS5 full-text index over Job
+
+Revision ID: 377e1d5ba628
+Revises: 5d0c3f4c0035
+Create Date: 2026-10-18 14:03:27.918452
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '377e1d5ba628'
+down_revision = '5d0c3f4c0035'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    from fulltext import ensure_fts, rebuild_fts
+
+    bind = op.get_bind()
+    ensure_fts(bind)
+    rebuild_fts(bind)
+
+
+def downgrade():
+    for trigger in ('job_fts_au', 'job_fts_ad', 'job_fts_ai'):
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.execute('DROP TABLE IF EXISTS job_fts')
@@ -0,0 +1,62 @@
+"""Add numeric budget columns and listing indexes to Job
+
+Revision ID: 5d0c3f4c0035
+Revises: 8ba919560bcc
+Create Date: 2026-10-18 11:40:05.201846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5d0c3f4c0035'
+down_revision = '8ba919560bcc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    from utils import parse_budget
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column['name'] for column in inspector.get_columns('job')}
+    indexes = {index['name'] for index in inspector.get_indexes('job')}
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        if 'budget_min' not in columns:
+            batch_op.add_column(sa.Column('budget_min', sa.Float(), nullable=True))
+        if 'budget_max' not in columns:
+            batch_op.add_column(sa.Column('budget_max', sa.Float(), nullable=True))
+        if 'budget_kind' not in columns:
+            batch_op.add_column(sa.Column('budget_kind', sa.String(length=10), nullable=False, server_default='unknown'))
+        if 'ix_job_user_status_budget' not in indexes:
+            batch_op.create_index('ix_job_user_status_budget', ['user_id', 'status', 'budget_max', 'id'], unique=False)
+        if 'ix_job_user_budget' not in indexes:
+            batch_op.create_index('ix_job_user_budget', ['user_id', 'budget_max', 'id'], unique=False)
+
+    # Заполняем числовые колонки для уже сохранённых заказов
+    job = sa.table('job', sa.column('id', sa.Integer), sa.column('budget', sa.String),
+                   sa.column('budget_min', sa.Float), sa.column('budget_max', sa.Float), sa.column('budget_kind', sa.String))
+    rows = bind.execute(sa.select(job.c.id, job.c.budget)).fetchall()
+    updates = []
+    for row in rows:
+        budget_min, budget_max, budget_kind = parse_budget(row.budget)
+        updates.append({'job_id': row.id, 'budget_min': budget_min, 'budget_max': budget_max, 'budget_kind': budget_kind})
+    if updates:
+        bind.execute(
+            job.update().where(job.c.id == sa.bindparam('job_id')).values(
+                budget_min=sa.bindparam('budget_min'),
+                budget_max=sa.bindparam('budget_max'),
+                budget_kind=sa.bindparam('budget_kind')
+            ),
+            updates
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_index('ix_job_user_budget')
+        batch_op.drop_index('ix_job_user_status_budget')
+        batch_op.drop_column('budget_kind')
+        batch_op.drop_column('budget_max')
+        batch_op.drop_column('budget_min')
@@ -0,0 +1,28 @@
+"""Import cache/favorites.json into favorite
+
+Revision ID: 68d7a8138b16
+Revises: b1795a7e28cd
+Create Date: 2026-10-18 16:40:12.550218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '68d7a8138b16'
+down_revision = 'b1795a7e28cd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    import os
+    from favorites import import_favorites_json
+
+    path = os.path.join(os.path.dirname(__file__), '..', '..', 'cache', 'favorites.json')
+    import_favorites_json(op.get_bind(), os.path.normpath(path))
+
+
+def downgrade():
+    # Импорт данных не откатывается: строки favorite могли появиться и после него
+    pass
@@ -0,0 +1,39 @@
+"""Add search_cache_entry table
+
+Revision ID: 8ba919560bcc
+Revises: 1b00d50d0026
+Create Date: 2026-10-18 09:12:40.512733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8ba919560bcc'
+down_revision = '1b00d50d0026'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Таблица может уже существовать: app.py вызывает db.create_all() при импорте
+    if sa.inspect(op.get_bind()).has_table('search_cache_entry'):
+        return
+    op.create_table(
+        'search_cache_entry',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('results', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('accessed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('key')
+    )
+    with op.batch_alter_table('search_cache_entry', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_search_cache_entry_accessed_at'), ['accessed_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('search_cache_entry', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_search_cache_entry_accessed_at'))
+    op.drop_table('search_cache_entry')
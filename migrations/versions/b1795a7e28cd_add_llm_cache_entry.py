@@ -0,0 +1,39 @@
+"""Add llm_cache_entry table
+
+Revision ID: b1795a7e28cd
+Revises: 129aedcf74ec
+Create Date: 2026-10-18 16:02:44.117390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b1795a7e28cd'
+down_revision = '129aedcf74ec'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Таблица может уже существовать: app.py вызывает db.create_all() при импорте
+    if sa.inspect(op.get_bind()).has_table('llm_cache_entry'):
+        return
+    op.create_table(
+        'llm_cache_entry',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('response', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('accessed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('key')
+    )
+    with op.batch_alter_table('llm_cache_entry', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_llm_cache_entry_accessed_at'), ['accessed_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('llm_cache_entry', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_llm_cache_entry_accessed_at'))
+    op.drop_table('llm_cache_entry')
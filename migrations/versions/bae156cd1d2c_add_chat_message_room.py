@@ -0,0 +1,32 @@
+"""Add room column and room/timestamp index to chat_message
+
+Revision ID: bae156cd1d2c
+Revises: cc024e157037
+Create Date: 2026-10-18 18:34:02.771530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'bae156cd1d2c'
+down_revision = 'cc024e157037'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('chat_message')}
+    indexes = {index['name'] for index in inspector.get_indexes('chat_message')}
+    with op.batch_alter_table('chat_message', schema=None) as batch_op:
+        if 'room' not in columns:
+            batch_op.add_column(sa.Column('room', sa.String(length=50), nullable=False, server_default='general'))
+        if 'ix_chat_message_room_timestamp' not in indexes:
+            batch_op.create_index('ix_chat_message_room_timestamp', ['room', 'timestamp', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('chat_message', schema=None) as batch_op:
+        batch_op.drop_index('ix_chat_message_room_timestamp')
+        batch_op.drop_column('room')
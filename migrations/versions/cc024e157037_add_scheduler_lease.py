@@ -0,0 +1,32 @@
+"""Add scheduler_lease table
+
+Revision ID: cc024e157037
+Revises: 68d7a8138b16
+Create Date: 2026-10-18 17:25:51.604113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'cc024e157037'
+down_revision = '68d7a8138b16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Таблица может уже существовать: app.py вызывает db.create_all() при импорте
+    if sa.inspect(op.get_bind()).has_table('scheduler_lease'):
+        return
+    op.create_table(
+        'scheduler_lease',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('owner', sa.String(length=100), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('scheduler_lease')
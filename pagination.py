@@ -0,0 +1,71 @@
+import base64
+import json
+
+from sqlalchemy import and_, or_
+
+from users.models import Job
+
+PAGE_SIZE = 30
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Decode a cursor token; returns None for a missing or malformed token."""
+    if not token:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _valid_cursor(values, order):
+    """A decoded cursor is [id] or [budget_max, id]: ids are ints, budgets are numbers or null."""
+    if not values or len(values) != (1 if order == "id" else 2):
+        return False
+    *budget, job_id = values
+    # bool — подкласс int, но в курсоре его быть не может
+    if type(job_id) is not int:
+        return False
+    return not budget or budget[0] is None or type(budget[0]) in (int, float)
+
+
+def _after(order, cursor):
+    """Filter for rows strictly after the cursor in the given descending order."""
+    if order == "id":
+        return Job.id < cursor[0]
+    budget, job_id = cursor
+    # В SQLite NULL идёт последним при DESC, поэтому заказы без бюджета — хвост списка
+    if budget is None:
+        return and_(Job.budget_max.is_(None), Job.id < job_id)
+    return or_(
+        Job.budget_max < budget,
+        and_(Job.budget_max == budget, Job.id < job_id),
+        Job.budget_max.is_(None),
+    )
+
+
+def keyset_page(query, cursor=None, limit=PAGE_SIZE, order="budget"):
+    """Return (jobs, next_cursor) for one page of a Job query.
+
+    order="budget" pages by (budget_max desc, id desc), order="id" by id desc;
+    both are served by the (user_id, [status,] budget_max, id) indexes.
+    """
+    limit = max(1, min(limit or PAGE_SIZE, MAX_PAGE_SIZE))
+    values = decode_cursor(cursor)
+    # Подделанный или устаревший курсор не должен доходить до SQL — отдаём первую страницу
+    if _valid_cursor(values, order):
+        query = query.filter(_after(order, values))
+    ordering = (Job.id.desc(),) if order == "id" else (Job.budget_max.desc(), Job.id.desc())
+    jobs = query.order_by(*ordering).limit(limit + 1).all()
+    next_cursor = None
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        last = jobs[-1]
+        next_cursor = encode_cursor([last.id] if order == "id" else [last.budget_max, last.id])
+    return jobs, next_cursor
@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def iter_ndjson(stream):
+    """Yield one decoded record per non-empty NDJSON line of a text stream."""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            logger.warning(f"Некорректная NDJSON-строка парсера: {line}")
+
+
+def parser_env(production):
+    """Environment for a parser process; PARSER_PRODUCTION=1 selects the headless mode of parsers/sources.js."""
+    return {**os.environ, "PARSER_PRODUCTION": "1" if production else "0"}
+
+
+def spawn_parser(args, cwd=None, known=None, production=False):
+    """Run a one-shot parser script and yield its jobs as they are printed.
+
+    `known` (a BloomFilter of stored links) is too large for argv, so it is
+    written to a temporary JSON file whose path becomes the last argument.
+    """
+    known_path = None
+    if known is not None:
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+            json.dump(known.to_dict(), f)
+            known_path = f.name
+        args = [*args, known_path]
+    try:
+        proc = subprocess.Popen(args, stdout=subprocess.PIPE, cwd=cwd, env=parser_env(production), text=True, encoding="utf-8")
+        try:
+            yield from iter_ndjson(proc.stdout)
+        finally:
+            proc.stdout.close()
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, args)
+    finally:
+        if known_path:
+            os.unlink(known_path)
+
+
+class ParserDaemon:
+    """Client for the long-lived Node parser service (parsers/parser_daemon.js)."""
+
+    def __init__(self, script, pool_size=3, timeout=900, cwd=None, production=False):
+        self.script = script
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.cwd = cwd
+        self.production = production
+        self._proc = None
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the daemon unless it is already running."""
+        with self._lock:
+            if self._proc and self._proc.poll() is None:
+                return self._proc
+            logger.info(f"Запуск демона парсеров: {self.script}")
+            self._proc = subprocess.Popen(
+                ["node", self.script, str(self.pool_size)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                cwd=self.cwd,
+                env=parser_env(self.production),
+                text=True,
+                encoding="utf-8",
+                bufsize=1,
+            )
+            threading.Thread(target=self._read, args=(self._proc,), daemon=True).start()
+            return self._proc
+
+    def stop(self):
+        with self._lock:
+            proc, self._proc = self._proc, None
+        if proc and proc.poll() is None:
+            proc.stdin.close()
+            try:
+                proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    def scrape_iter(self, source, topic, min_price=0, max_price=None, region="", timeout=None, known=None, concurrency=1):
+        """Send one scrape request and yield its jobs as the daemon streams them.
+
+        Cards whose links are in `known` (a BloomFilter) are not opened or
+        reported; up to `concurrency` cards are read in parallel tabs and
+        still arrive in listing order.
+        """
+        request_id = uuid.uuid4().hex
+        request = {
+            "id": request_id,
+            "source": source,
+            "topic": topic,
+            "min_price": min_price,
+            "max_price": max_price or None,
+            "region": region or "",
+            "concurrency": concurrency,
+        }
+        if known is not None:
+            request["known"] = known.to_dict()
+        try:
+            records = self._send(request_id, json.dumps(request, ensure_ascii=False) + "\n")
+            while True:
+                try:
+                    record = records.get(timeout=timeout or self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"Демон парсеров не ответил на запрос {request_id}")
+                if record is _DONE:
+                    return
+                if isinstance(record, Exception):
+                    raise record
+                yield record
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+    def _send(self, request_id, line):
+        """Register a request and write it to the daemon; a daemon that died since start() is restarted once."""
+        for _ in range(2):
+            proc = self.start()
+            records = queue.Queue()
+            with self._lock:
+                self._pending[request_id] = (proc, records)
+                try:
+                    proc.stdin.write(line)
+                    proc.stdin.flush()
+                    return records
+                except OSError as e:
+                    # Новая очередь на повтор: _read умершего процесса ещё может положить ошибку в старую
+                    self._pending.pop(request_id, None)
+                    if self._proc is proc:
+                        self._proc = None
+                    error = e
+            proc.kill()
+            logger.warning(f"Демон парсеров недоступен ({error}), перезапуск")
+        raise error
+
+    def _read(self, proc):
+        for message in iter_ndjson(proc.stdout):
+            with self._lock:
+                _, records = self._pending.get(message.get("id"), (None, None))
+            if not records:
+                continue
+            if "job" in message:
+                records.put(message["job"])
+            elif message.get("error"):
+                records.put(RuntimeError(message["error"]))
+            elif message.get("done"):
+                records.put(_DONE)
+        logger.warning(f"Демон парсеров завершился с кодом {proc.wait()}")
+        with self._lock:
+            orphaned = [records for owner, records in self._pending.values() if owner is proc]
+        for records in orphaned:
+            records.put(RuntimeError("Демон парсеров завершился"))
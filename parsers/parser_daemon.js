@@ -0,0 +1,132 @@
+require('dotenv').config({ path: require('path').resolve(__dirname, '../.env') });
+const readline = require('readline');
+const puppeteer = require('puppeteer-extra');
+const StealthPlugin = require('puppeteer-extra-plugin-stealth');
+const { SOURCES, PRODUCTION, createLogger, launchOptions, preparePage, loadCookies, scrape } = require('./sources');
+
+puppeteer.use(StealthPlugin());
+
+// Долгоживущий парсер: один прогретый браузер и пул страниц.
+// Запросы приходят JSON-строками в stdin, ответы уходят JSON-строками в stdout,
+// по одной строке на каждую карточку, как только она разобрана:
+//   -> {"id": "...", "source": "upwork", "topic": "...", "min_price": 0, "max_price": null, "region": "", "known": {...}, "concurrency": 4}
+//      known (необязательно) — фильтр Блума уже сохранённых ссылок, их карточки не открываются
+//      concurrency (необязательно) — сколько карточек читать параллельно; вкладки берутся из пула страниц
+//   <- {"id": "...", "job": {...}}  (ноль или больше раз)
+//   <- {"id": "...", "done": true, "count": 3} или {"id": "...", "error": "..."}
+
+const logger = createLogger({ stderr: true });
+const poolSize = parseInt(process.argv[2] || process.env.PARSER_POOL_SIZE) || 3;
+
+class PagePool {
+  constructor(browser, size) {
+    this.browser = browser;
+    this.size = size;
+    this.created = 0;
+    this.idle = [];
+    this.waiters = [];
+  }
+
+  async acquire() {
+    if (this.idle.length) return this.idle.pop();
+    if (this.created < this.size) {
+      this.created++;
+      try {
+        const page = await this.browser.newPage();
+        await preparePage(page);
+        for (const sourceKey of Object.keys(SOURCES)) {
+          await loadCookies(page, sourceKey, logger).catch(err => logger.warn(`⚠️ Cookies ${sourceKey}: ${err.message}`));
+        }
+        return page;
+      } catch (err) {
+        this.created--;
+        throw err;
+      }
+    }
+    return new Promise(resolve => this.waiters.push(resolve));
+  }
+
+  // Без ожидания: свободная или новая страница в пределах size, иначе null.
+  // Дополнительные вкладки парсинга не ждут, чтобы запросы не заблокировали друг друга.
+  async tryAcquire() {
+    if (this.idle.length || this.created < this.size) return this.acquire();
+    return null;
+  }
+
+  release(page) {
+    if (page.isClosed()) {
+      this.created--;
+      const waiter = this.waiters.shift();
+      if (waiter) this.acquire().then(waiter);
+      return;
+    }
+    const waiter = this.waiters.shift();
+    if (waiter) waiter(page);
+    else this.idle.push(page);
+  }
+}
+
+function send(message) {
+  process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+async function handle(pool, request) {
+  const { id, source } = request;
+  if (!SOURCES[source]) {
+    send({ id, error: `Неизвестный источник: ${source}` });
+    return;
+  }
+  const page = await pool.acquire();
+  try {
+    logger.info(`🚀 Запрос ${id}: ${SOURCES[source].name} «${request.topic}»`);
+    const jobs = await scrape(page, source, {
+      topic: request.topic,
+      minPrice: request.min_price,
+      maxPrice: request.max_price,
+      region: request.region,
+      known: request.known,
+      concurrency: request.concurrency
+    }, logger, job => send({ id, job }), {
+      acquire: () => pool.tryAcquire(),
+      release: tab => pool.release(tab)
+    });
+    send({ id, done: true, count: jobs.length });
+    logger.info(`📦 Запрос ${id}: ${jobs.length} заказов`);
+  } catch (err) {
+    logger.error(`❌ Запрос ${id}: ${err.message}`);
+    send({ id, error: err.message });
+  } finally {
+    pool.release(page);
+  }
+}
+
+(async () => {
+  logger.info(`🚀 Запуск демона парсеров (страниц в пуле: ${poolSize}${PRODUCTION ? ', боевой режим' : ''})`);
+  const browser = await puppeteer.launch(launchOptions());
+  const pool = new PagePool(browser, poolSize);
+
+  const shutdown = async () => {
+    logger.info('📴 Остановка демона парсеров');
+    await browser.close().catch(() => {});
+    process.exit(0);
+  };
+  process.on('SIGTERM', shutdown);
+  process.on('SIGINT', shutdown);
+
+  const rl = readline.createInterface({ input: process.stdin });
+  rl.on('line', line => {
+    if (!line.trim()) return;
+    let request;
+    try {
+      request = JSON.parse(line);
+    } catch (err) {
+      logger.warn(`⚠️ Некорректный запрос: ${line}`);
+      return;
+    }
+    handle(pool, request).catch(err => send({ id: request.id, error: err.message }));
+  });
+  rl.on('close', shutdown);
+})().catch(err => {
+  logger.error(`❌ Демон парсеров не запустился: ${err.message}`);
+  process.exit(1);
+});
@@ -1,103 +1,42 @@
 require('dotenv').config({ path: require('path').resolve(__dirname, '../.env') });
-const fs = require('fs').promises;
+const fsSync = require('fs');
 const puppeteer = require('puppeteer-extra');
 const StealthPlugin = require('puppeteer-extra-plugin-stealth');
-const path = require('path');
-const winston = require('winston');
+const { PRODUCTION, createLogger, wait, launchOptions, preparePage, scrape } = require('./sources');
 
 puppeteer.use(StealthPlugin());
 
-const logger = winston.createLogger({
-  level: 'info',
-  format: winston.format.combine(
-    winston.format.timestamp(),
-    winston.format.printf(({ timestamp, level, message }) => `${timestamp} - ${level.toUpperCase()} - ${message}`)
-  ),
-  transports: [
-    new winston.transports.File({ filename: 'logs/app.log' }),
-    new winston.transports.Console()
-  ]
-});
+const logger = createLogger({ stderr: true });
 
-const topic = (process.argv[2] || '').toLowerCase();
-const minPrice = parseInt(process.argv[3]) || 0;
-const maxPrice = parseInt(process.argv[4]) || Infinity;
-const region = (process.argv[5] || '').toLowerCase();
-const jobs = [];
-
-function wait(ms, msg) {
-  if (msg) logger.info(msg);
-  return new Promise(r => setTimeout(r, ms));
-}
-
-function parseBudget(text) {
-  const match = text?.match(/\$[\s]*([\d,.]+)/);
-  return match ? parseFloat(match[1].replace(/,/g, '')) : NaN;
-}
+const params = {
+  topic: process.argv[2],
+  minPrice: process.argv[3],
+  maxPrice: process.argv[4],
+  region: process.argv[5],
+  concurrency: process.argv[6],
+  // Необязательный путь к JSON с фильтром уже известных ссылок
+  known: process.argv[7] ? JSON.parse(fsSync.readFileSync(process.argv[7], 'utf-8')) : null
+};
 
 (async () => {
   let browser;
   try {
     logger.info('🚀 Запуск Puppeteer для Upwork');
-    browser = await puppeteer.launch({ headless: false });
+    browser = await puppeteer.launch(launchOptions());
     const page = await browser.newPage();
-    await page.setUserAgent('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36');
-
-    const url = `https://www.upwork.com/nx/jobs/search/?q=${encodeURIComponent(topic)}`;
-    logger.info(`🌐 Переход на: ${url}`);
-    await page.goto(url, { waitUntil: 'networkidle2', timeout: 60000 });
-
-    let lastHeight = await page.evaluate('document.body.scrollHeight');
-    for (let i = 0; i < 5; i++) {
-      await page.evaluate('window.scrollTo(0, document.body.scrollHeight)');
-      await wait(2000, '📜 Прокрутили страницу вниз');
-      const newHeight = await page.evaluate('document.body.scrollHeight');
-      if (newHeight === lastHeight) break;
-      lastHeight = newHeight;
-    }
-
-    const links = await page.$$eval('a[data-test="job-tile-title-link UpLink"]', els => [...new Set(els.map(el => el.href))]);
-    logger.info(`🔗 Найдено ссылок: ${links.length}`);
-
-    for (const link of links) {
-      try {
-        await page.goto(link, { waitUntil: 'domcontentloaded', timeout: 60000 });
-        await wait(10000, `📄 Чтение карточки: ${link}`);
-
-        const title = await page.$eval('h1', el => el.innerText).catch(() => 'Без названия');
-        const description = await page.$$eval('p', els => els.map(el => el.innerText).join('\n')).catch(() => 'Нет описания');
-        const budgetText = await page.$$eval('*', els => els.map(el => el.innerText).find(txt => /\$\s*\d+/.test(txt)) || '—').catch(() => '—');
-        const regionText = await page.$eval('li[data-qa="client-location"] strong', el => el.innerText).catch(() => 'Не указан');
-
-        const parsedPrice = parseBudget(budgetText);
-
-        if (isNaN(parsedPrice)) {
-          logger.warn(`⚠️ Цена не найдена: ${budgetText}`);
-          if (!region || regionText.toLowerCase().includes(region)) {
-            jobs.push({ title: `Upwork: ${title}`, budget: 'неизвестно', description, link, region: regionText });
-          }
-        } else if (parsedPrice >= minPrice && parsedPrice <= maxPrice && (!region || regionText.toLowerCase().includes(region))) {
-          jobs.push({ title: `Upwork: ${title}`, budget: `$${parsedPrice}`, description, link, region: regionText });
-          logger.info(`✅ Добавлено: ${title} ($${parsedPrice}, ${regionText})`);
-        } else {
-          logger.info(`⛔ Пропущено: $${parsedPrice} (min: ${minPrice}, max: ${maxPrice}) или регион ${regionText} не ${region}`);
-        }
-      } catch (err) {
-        logger.warn(`⚠️ Ошибка карточки: ${link} — ${err.message}`);
-      }
-    }
+    await preparePage(page);
 
-    const outputPath = path.resolve(__dirname, '../results/upwork.json');
-    await fs.mkdir(path.dirname(outputPath), { recursive: true });
-    await fs.writeFile(outputPath, JSON.stringify(jobs, null, 2), 'utf-8');
-    logger.info('📦 Сохранено в upwork.json');
-    console.log(JSON.stringify(jobs));
+    // Каждая карточка — отдельная NDJSON-строка в stdout, логи идут в stderr
+    const jobs = await scrape(page, 'upwork', params, logger, job => process.stdout.write(JSON.stringify(job) + '\n'));
+    logger.info(`📦 Отправлено заказов: ${jobs.length}`);
   } catch (err) {
     logger.error(`❌ Ошибка: ${err.message}`);
+    // Ненулевой код — Python (spawn_parser) считает парсинг неудачным и не кэширует пустой результат
+    process.exitCode = 1;
   } finally {
     if (browser) {
-      await wait(10000, '📴 Закрытие браузера');
+      if (!PRODUCTION) await wait(10000, '📴 Закрытие браузера', logger);
       await browser.close();
     }
   }
-})();
\ No newline at end of file
+})();
@@ -0,0 +1,246 @@
+const path = require('path');
+const fs = require('fs').promises;
+const crypto = require('crypto');
+const winston = require('winston');
+
+const USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36';
+
+// Боевой режим включает Python (PARSER_PRODUCTION=1): браузер без окна, без картинок/шрифтов/стилей,
+// вместо фиксированных пауз — ожидание селекторов и тишины в сети с верхними границами (мс)
+const PRODUCTION = process.env.PARSER_PRODUCTION === '1';
+const BLOCKED_RESOURCES = new Set(['image', 'media', 'font', 'stylesheet']);
+const WAIT_LIMITS = { listing: 15000, scroll: 3000, detail: 10000, idle: 3000 };
+
+const SOURCES = {
+  upwork: {
+    name: 'Upwork',
+    cookiesFile: 'upwork_cookies.json',
+    searchUrl: topic => `https://www.upwork.com/nx/jobs/search/?q=${encodeURIComponent(topic)}`,
+    linkSelector: 'a[data-test="job-tile-title-link UpLink"]',
+    region: page => page.$eval('li[data-qa="client-location"] strong', el => el.innerText)
+  },
+  guru: {
+    name: 'Guru',
+    cookiesFile: 'guru_cookies.json',
+    searchUrl: topic => `https://www.guru.com/d/jobs/q/${encodeURIComponent(topic)}/`,
+    linkSelector: 'a.jobTitle',
+    region: page => page.$eval('div.jobLocations[title*="Preferred Locations"]', el => el.getAttribute('title').replace('Preferred Locations: ', ''))
+  }
+};
+
+// Когда stdout занят NDJSON-выводом, консольные логи уходят в stderr
+function createLogger({ stderr = false } = {}) {
+  return winston.createLogger({
+    level: 'info',
+    format: winston.format.combine(
+      winston.format.timestamp(),
+      winston.format.printf(({ timestamp, level, message }) => `${timestamp} - ${level.toUpperCase()} - ${message}`)
+    ),
+    transports: [
+      new winston.transports.File({ filename: 'logs/app.log' }),
+      new winston.transports.Console(stderr ? { stderrLevels: ['error', 'warn', 'info', 'debug'] } : {})
+    ]
+  });
+}
+
+function wait(ms, msg, logger) {
+  if (msg && logger) logger.info(msg);
+  return new Promise(r => setTimeout(r, ms));
+}
+
+function launchOptions() {
+  return PRODUCTION ? { headless: true, args: ['--no-sandbox', '--disable-dev-shm-usage'] } : { headless: false };
+}
+
+async function preparePage(page) {
+  await page.setUserAgent(USER_AGENT);
+  if (!PRODUCTION) return;
+  await page.setRequestInterception(true);
+  page.on('request', request => {
+    if (BLOCKED_RESOURCES.has(request.resourceType())) request.abort().catch(() => {});
+    else request.continue().catch(() => {});
+  });
+}
+
+// Ждёт селектор и затихание сети, но не дольше лимитов; в отладочном режиме — фиксированная пауза
+async function settle(page, selector, ms, msg, logger) {
+  if (!PRODUCTION) return wait(ms, msg, logger);
+  if (msg) logger.info(msg);
+  await page.waitForSelector(selector, { timeout: ms }).catch(() => {});
+  await page.waitForNetworkIdle({ idleTime: 500, timeout: WAIT_LIMITS.idle }).catch(() => {});
+}
+
+function parseBudget(text) {
+  const match = text?.match(/\$[\s]*([\d,.]+)/);
+  return match ? parseFloat(match[1].replace(/,/g, '')) : NaN;
+}
+
+async function loadCookies(page, sourceKey, logger) {
+  const cookiesPath = path.resolve(__dirname, SOURCES[sourceKey].cookiesFile);
+  if (!(await fs.access(cookiesPath).then(() => true).catch(() => false))) return false;
+  const cookies = JSON.parse(await fs.readFile(cookiesPath, 'utf-8'));
+  await page.setCookie(...cookies);
+  logger.info(`✅ Cookies ${SOURCES[sourceKey].name} загружены`);
+  return true;
+}
+
+// Ссылка без query и якоря; то же правило в known_links.py
+function linkKey(link) {
+  return link.split('#')[0].split('?')[0].trim();
+}
+
+// Фильтр Блума уже известных ссылок от Python: {m, k, bits (base64)}
+function knownLinks(spec) {
+  if (!spec || !spec.m || !spec.k || !spec.bits) return null;
+  const bits = Buffer.from(spec.bits, 'base64');
+  return {
+    has(link) {
+      const digest = crypto.createHash('sha1').update(linkKey(link), 'utf8').digest();
+      const h1 = digest.readUInt32BE(0);
+      const h2 = (digest.readUInt32BE(4) | 1) >>> 0;
+      for (let i = 0; i < spec.k; i++) {
+        const index = (h1 + i * h2) % spec.m;
+        if (!(bits[index >> 3] & (1 << (index & 7)))) return false;
+      }
+      return true;
+    }
+  };
+}
+
+function normalizeParams(params) {
+  return {
+    topic: (params.topic || '').toLowerCase(),
+    minPrice: parseInt(params.minPrice) || 0,
+    maxPrice: parseInt(params.maxPrice) || Infinity,
+    region: (params.region || '').toLowerCase(),
+    known: knownLinks(params.known),
+    concurrency: Math.max(1, parseInt(params.concurrency) || 1)
+  };
+}
+
+// Дополнительные вкладки по умолчанию — новые в том же браузере (cookies общие), закрываются после парсинга.
+// Демон передаёт свои acquire/release, чтобы вкладки брались из общего пула и возвращались в него.
+function browserTabs(page) {
+  return {
+    acquire: async () => {
+      const tab = await page.browser().newPage();
+      await preparePage(tab);
+      return tab;
+    },
+    release: tab => tab.close().catch(() => {})
+  };
+}
+
+// Основная страница плюс до concurrency - 1 дополнительных вкладок; acquire может вернуть null, если свободных нет
+async function openDetailPages(page, concurrency, tabs, logger) {
+  const pages = [page];
+  for (let i = 1; i < concurrency; i++) {
+    try {
+      const tab = await tabs.acquire();
+      if (!tab) break;
+      pages.push(tab);
+    } catch (err) {
+      logger.warn(`⚠️ Не удалось открыть вкладку: ${err.message}`);
+      break;
+    }
+  }
+  return pages;
+}
+
+// Читает одну карточку; возвращает заказ или null (отфильтрован или ошибка — остальные ссылки не страдают)
+async function readCard(page, source, link, { minPrice, maxPrice, region }, logger) {
+  try {
+    await page.goto(link, { waitUntil: 'domcontentloaded', timeout: 60000 });
+    await settle(page, 'h1', WAIT_LIMITS.detail, `📄 Чтение карточки: ${link}`, logger);
+
+    const title = await page.$eval('h1', el => el.innerText).catch(() => 'Без названия');
+    const description = await page.$$eval('p', els => els.map(el => el.innerText).join('\n')).catch(() => 'Нет описания');
+    const budgetText = await page.$$eval('*', els => els.map(el => el.innerText).find(txt => /\$\s*\d+/.test(txt)) || '—').catch(() => '—');
+    const regionText = await source.region(page).catch(() => 'Не указан');
+
+    const parsedPrice = parseBudget(budgetText);
+
+    if (isNaN(parsedPrice)) {
+      logger.warn(`⚠️ Цена не найдена: ${budgetText}`);
+      if (!region || regionText.toLowerCase().includes(region)) {
+        return { title: `${source.name}: ${title}`, budget: 'неизвестно', description, link, region: regionText };
+      }
+    } else if (parsedPrice >= minPrice && parsedPrice <= maxPrice && (!region || regionText.toLowerCase().includes(region))) {
+      logger.info(`✅ Добавлено: ${title} ($${parsedPrice}, ${regionText})`);
+      return { title: `${source.name}: ${title}`, budget: `$${parsedPrice}`, description, link, region: regionText };
+    } else {
+      logger.info(`⛔ Пропущено: $${parsedPrice} (min: ${minPrice}, max: ${maxPrice}) или регион ${regionText} не ${region}`);
+    }
+  } catch (err) {
+    logger.warn(`⚠️ Ошибка карточки: ${link} — ${err.message}`);
+  }
+  return null;
+}
+
+// onJob вызывается для каждой найденной карточки сразу, не дожидаясь конца обхода
+async function scrape(page, sourceKey, params, logger, onJob = () => {}, tabs = browserTabs(page)) {
+  const source = SOURCES[sourceKey];
+  const { topic, minPrice, maxPrice, region, known, concurrency } = normalizeParams(params);
+  const jobs = [];
+
+  const url = source.searchUrl(topic);
+  logger.info(`🌐 Переход на: ${url}`);
+  if (PRODUCTION) {
+    await page.goto(url, { waitUntil: 'domcontentloaded', timeout: 60000 });
+    await settle(page, source.linkSelector, WAIT_LIMITS.listing, null, logger);
+  } else {
+    await page.goto(url, { waitUntil: 'networkidle2', timeout: 60000 });
+  }
+
+  let lastHeight = await page.evaluate('document.body.scrollHeight');
+  for (let i = 0; i < 5; i++) {
+    await page.evaluate('window.scrollTo(0, document.body.scrollHeight)');
+    if (PRODUCTION) {
+      // Дальше листать, только если страница действительно подгрузила карточки
+      const grew = await page.waitForFunction(h => document.body.scrollHeight > h, { timeout: WAIT_LIMITS.scroll }, lastHeight)
+        .then(() => true, () => false);
+      if (!grew) break;
+      logger.info('📜 Прокрутили страницу вниз');
+    } else {
+      await wait(2000, '📜 Прокрутили страницу вниз', logger);
+    }
+    const newHeight = await page.evaluate('document.body.scrollHeight');
+    if (newHeight === lastHeight) break;
+    lastHeight = newHeight;
+  }
+
+  const found = await page.$$eval(source.linkSelector, els => [...new Set(els.map(el => el.href))]);
+  // Карточки, которые уже есть в БД, не открываем
+  const links = known ? found.filter(link => !known.has(link)) : found;
+  logger.info(`🔗 Найдено ссылок: ${found.length}, новых: ${links.length}`);
+
+  // Карточки читаются параллельно на нескольких вкладках, но отдаются в порядке ссылок
+  const results = new Array(links.length);
+  let next = 0;
+  let emitted = 0;
+  const emitReady = () => {
+    while (emitted < links.length && results[emitted] !== undefined) {
+      const job = results[emitted++];
+      if (job) {
+        jobs.push(job);
+        onJob(job);
+      }
+    }
+  };
+
+  const pages = await openDetailPages(page, Math.min(concurrency, links.length), tabs, logger);
+  try {
+    await Promise.all(pages.map(async tab => {
+      while (next < links.length) {
+        const index = next++;
+        results[index] = await readCard(tab, source, links[index], { minPrice, maxPrice, region }, logger);
+        emitReady();
+      }
+    }));
+  } finally {
+    await Promise.all(pages.filter(tab => tab !== page).map(tab => tabs.release(tab)));
+  }
+  return jobs;
+}
+
+module.exports = { SOURCES, USER_AGENT, PRODUCTION, createLogger, wait, launchOptions, preparePage, parseBudget, loadCookies, scrape };
@@ -0,0 +1,40 @@
+import threading
+from collections import defaultdict
+
+
+class Presence:
+    """Online users by SocketIO session id; a user is online while any of their tabs is connected."""
+
+    def __init__(self):
+        self._sids = defaultdict(set)
+        self._users = {}
+        self._lock = threading.Lock()
+
+    def connect(self, user_id, sid):
+        """Register a connection; returns True if the user just came online."""
+        with self._lock:
+            self._users[sid] = user_id
+            came_online = not self._sids[user_id]
+            self._sids[user_id].add(sid)
+            return came_online
+
+    def disconnect(self, sid):
+        """Forget a connection; returns the user id if the user just went offline, else None."""
+        with self._lock:
+            user_id = self._users.pop(sid, None)
+            if user_id is None:
+                return None
+            sids = self._sids[user_id]
+            sids.discard(sid)
+            if sids:
+                return None
+            del self._sids[user_id]
+            return user_id
+
+    def online(self):
+        with self._lock:
+            return sorted(self._sids)
+
+    def __contains__(self, user_id):
+        with self._lock:
+            return bool(self._sids.get(user_id))
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per `period` seconds."""
+
+    def __init__(self, rate, period=60.0):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.period)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) * self.period / self.rate
+            time.sleep(delay)
+
+
+class SourceLimiter:
+    """Caps concurrent scrapes and scrape starts per minute for one source."""
+
+    def __init__(self, concurrency, per_minute):
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._rate = RateLimiter(per_minute)
+
+    @contextmanager
+    def slot(self):
+        with self._slots:
+            self._rate.acquire()
+            yield
+
+
+class CycleTracker:
+    """Prevents overlapping auto-parse cycles and keeps timing stats of recent ones."""
+
+    def __init__(self, history=20):
+        self._running = threading.Lock()
+        self._history = deque(maxlen=history)
+        self._current = None
+        self._stats_lock = threading.Lock()
+
+    @contextmanager
+    def cycle(self):
+        """Yield a stats dict for the new cycle, or None if one is already running."""
+        if not self._running.acquire(blocking=False):
+            yield None
+            return
+        stats = {"started_at": time.time(), "duration": None, "configs": 0, "products": [], "new_jobs": 0, "errors": 0}
+        self._current = stats
+        started = time.monotonic()
+        try:
+            yield stats
+        finally:
+            stats["duration"] = round(time.monotonic() - started, 2)
+            self._history.append(stats)
+            self._current = None
+            self._running.release()
+
+    @contextmanager
+    def product(self, stats, product):
+        entry = {"product": product, "duration": None, "new_jobs": 0, "error": None}
+        started = time.monotonic()
+        try:
+            yield entry
+        except Exception as e:
+            entry["error"] = str(e)
+            raise
+        finally:
+            entry["duration"] = round(time.monotonic() - started, 2)
+            with self._stats_lock:
+                stats["products"].append(entry)
+                stats["new_jobs"] += entry["new_jobs"]
+                stats["errors"] += bool(entry["error"])
+
+    def snapshot(self):
+        return {"running": self._current is not None, "current": self._current, "history": list(self._history)}
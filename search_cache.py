@@ -0,0 +1,112 @@
+import json
+import logging
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+
+from users.models import db, SearchCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+def _price(value):
+    try:
+        return f"{float(value):g}" if value not in (None, "") and float(value) else ""
+    except (TypeError, ValueError):
+        return ""
+
+
+def make_key(source, topic, min_price, max_price, region):
+    """Build a cache key from normalized search parameters."""
+    topic = " ".join(str(topic or "").lower().split())
+    region = " ".join(str(region or "").lower().split())
+    return "|".join([source, topic, _price(min_price), _price(max_price), region])
+
+
+class SearchCache:
+    """TTL + LRU cache of scraped records in the search_cache_entry table.
+
+    Concurrent misses on the same key share one scrape (single-flight):
+    the first caller streams records from the parser, later callers wait
+    for it and replay the stored result.
+    """
+
+    def __init__(self, ttl=300, max_entries=500):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        entry = SearchCacheEntry.query.filter_by(key=key).first()
+        if not entry:
+            return None
+        now = datetime.utcnow()
+        if now - entry.created_at > timedelta(seconds=self.ttl):
+            return None
+        entry.accessed_at = now
+        db.session.commit()
+        return json.loads(entry.results)
+
+    def set(self, key, records):
+        now = datetime.utcnow()
+        entry = SearchCacheEntry.query.filter_by(key=key).first() or SearchCacheEntry(key=key)
+        entry.results = json.dumps(records, ensure_ascii=False)
+        entry.created_at = now
+        entry.accessed_at = now
+        db.session.add(entry)
+        db.session.flush()
+        self._evict()
+        db.session.commit()
+
+    def _evict(self):
+        expired = datetime.utcnow() - timedelta(seconds=self.ttl)
+        SearchCacheEntry.query.filter(SearchCacheEntry.created_at < expired).delete(synchronize_session=False)
+        overflow = SearchCacheEntry.query.count() - self.max_entries
+        if overflow > 0:
+            oldest = db.session.query(SearchCacheEntry.id).order_by(SearchCacheEntry.accessed_at.asc()).limit(overflow)
+            SearchCacheEntry.query.filter(SearchCacheEntry.id.in_(oldest.scalar_subquery())).delete(synchronize_session=False)
+
+    def fetch(self, key, produce):
+        """Yield records for key from the cache, an in-flight scrape or a new one.
+
+        produce is a zero-argument callable returning an iterator of records.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            logger.info(f"Кэш поиска: попадание {key}")
+            yield from cached
+            return
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self.hits += 1
+            logger.info(f"Кэш поиска: ожидание текущего парсинга {key}")
+            yield from future.result()
+            return
+
+        self.misses += 1
+        records = []
+        try:
+            for record in produce():
+                records.append(record)
+                yield record
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else RuntimeError("Парсинг прерван"))
+            raise
+        else:
+            try:
+                self.set(key, records)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Кэш поиска: не удалось сохранить {key}: {e}")
+            future.set_result(records)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
@@ -0,0 +1,72 @@
+import threading
+import time
+import uuid
+
+
+class SearchRegistry:
+    """In-memory registry of background searches started by /search."""
+
+    def __init__(self, ttl=3600):
+        self.ttl = ttl
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def create(self, user_id, params, sources):
+        """Register a new search and return its id."""
+        search_id = uuid.uuid4().hex
+        with self._lock:
+            self._purge()
+            self._items[search_id] = {
+                "id": search_id,
+                "user_id": user_id,
+                "params": params,
+                "status": "pending",
+                "sources": {source: "pending" for source in sources},
+                "jobs": [],
+                "errors": {},
+                "created_at": time.time(),
+                "finished_at": None,
+            }
+        return search_id
+
+    def get(self, search_id):
+        """Return a snapshot of the search state or None."""
+        with self._lock:
+            item = self._items.get(search_id)
+            if not item:
+                return None
+            return {**item, "sources": dict(item["sources"]), "jobs": list(item["jobs"]), "errors": dict(item["errors"])}
+
+    def start(self, search_id):
+        with self._lock:
+            if search_id in self._items:
+                self._items[search_id]["status"] = "running"
+
+    def add_jobs(self, search_id, jobs):
+        with self._lock:
+            item = self._items.get(search_id)
+            if item:
+                item["jobs"].extend(jobs)
+
+    def source_done(self, search_id, source, error=None):
+        """Mark one source finished (its jobs arrive through add_jobs); returns True when all sources are finished."""
+        with self._lock:
+            item = self._items.get(search_id)
+            if not item:
+                return False
+            if error:
+                item["sources"][source] = "error"
+                item["errors"][source] = error
+            else:
+                item["sources"][source] = "done"
+            finished = all(state in ("done", "error") for state in item["sources"].values())
+            if finished:
+                item["status"] = "error" if len(item["errors"]) == len(item["sources"]) else "done"
+                item["finished_at"] = time.time()
+            return finished
+
+    def _purge(self):
+        now = time.time()
+        expired = [key for key, item in self._items.items() if item["finished_at"] and now - item["finished_at"] > self.ttl]
+        for key in expired:
+            del self._items[key]
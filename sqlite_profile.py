@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.orm import defer, undefer
+
+from users.models import db, Job
+
+logger = logging.getLogger(__name__)
+
+
+def apply_sqlite_profile(engine, pragmas):
+    """Run the configured PRAGMAs on every new DBAPI connection of a SQLite engine."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def current_pragmas(connection, names):
+    return {name: connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in names}
+
+
+def _percentiles(samples):
+    if not samples:
+        return {"count": 0}
+    samples = sorted(samples)
+
+    def pick(q):
+        return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 2)
+
+    return {"count": len(samples), "p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": round(samples[-1] * 1000, 2)}
+
+
+def run_contention_benchmark(app, user_id, readers=8, seconds=5.0, batch_size=150):
+    """Measure job-list read latency alone and while an ingest writer runs.
+
+    Readers page through the user's job list (the /my_tasks query); the
+    writer inserts synthetic jobs through ingest_jobs in a loop like an
+    auto-parse cycle. Synthetic rows are deleted afterwards. Compare
+    profiles by running it with different SQLITE_* environment settings.
+    """
+    from ingest import ingest_jobs
+    from pagination import keyset_page
+
+    stop = threading.Event()
+    errors = {"locked": 0, "other": 0}
+    errors_lock = threading.Lock()
+    prefix = f"bench:{uuid.uuid4().hex[:8]}:"
+
+    def record_error(e):
+        with errors_lock:
+            errors["locked" if "locked" in str(e) else "other"] += 1
+
+    def reader(samples):
+        with app.app_context():
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    query = Job.query.options(defer(Job.description), undefer(Job.description_preview)).filter(Job.user_id == user_id)
+                    keyset_page(query)
+                    samples.append(time.perf_counter() - started)
+                except Exception as e:
+                    record_error(e)
+                finally:
+                    db.session.remove()
+
+    def writer(written):
+        with app.app_context():
+            counter = 0
+            while not stop.is_set():
+                records = [{"title": f"Benchmark job {counter + i}", "description": "benchmark " * 50,
+                            "budget": f"${(counter + i) % 900 + 100}", "link": f"{prefix}{counter + i}"} for i in range(batch_size)]
+                counter += batch_size
+                try:
+                    written.append(len(ingest_jobs(records, user_id)))
+                except Exception as e:
+                    db.session.rollback()
+                    record_error(e)
+
+    def phase(with_writer):
+        stop.clear()
+        samples = [[] for _ in range(readers)]
+        written = []
+        threads = [threading.Thread(target=reader, args=(bucket,), daemon=True) for bucket in samples]
+        if with_writer:
+            threads.append(threading.Thread(target=writer, args=(written,), daemon=True))
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        result = _percentiles([sample for bucket in samples for sample in bucket])
+        if with_writer:
+            result["rows_written_per_s"] = round(sum(written) / seconds, 1)
+        return result
+
+    try:
+        results = {"baseline": phase(False), "with_writer": phase(True)}
+    finally:
+        with app.app_context():
+            Job.query.filter(Job.link.like(f"{prefix}%")).delete(synchronize_session=False)
+            db.session.commit()
+    results["errors"] = errors
+    return results
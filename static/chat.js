@@ -1,8 +1,18 @@
-<script src="https://cdn.socket.io/4.5.4/socket.io.min.js"></script>
+// Требует socket.io-клиента: <script src="https://cdn.socket.io/4.5.4/socket.io.min.js"></script>
 
 const socket = io();
 socket.emit('join');
 
+let chatRoom = 'general';
+let olderCursor = null;
+let oldestTimestamp = null;
+
+function renderMessage(data) {
+  const div = document.createElement('div');
+  div.textContent = data.user ? `[${data.time}] ${data.user}: ${data.msg}` : data.msg;
+  return div;
+}
+
 function sendMessage() {
   const input = document.getElementById('messageInput');
   if (input.value.trim()) {
@@ -10,8 +20,29 @@ function sendMessage() {
     input.value = '';
   }
 }
+
+// История из памяти сервера приходит сразу после входа в комнату
+socket.on('chat history', data => {
+  chatRoom = data.room;
+  const messages = document.getElementById('messages');
+  messages.replaceChildren(...data.messages.map(renderMessage));
+  oldestTimestamp = data.messages.length ? data.messages[0].timestamp : null;
+  olderCursor = null;
+});
+
 socket.on('chat message', data => {
-  const div = document.createElement('div');
-  div.textContent = data.msg;
-  document.getElementById('messages').appendChild(div);
+  document.getElementById('messages').appendChild(renderMessage(data));
 });
+
+// Более старые сообщения — постранично из БД
+async function loadOlderMessages() {
+  const params = new URLSearchParams({ room: chatRoom });
+  if (olderCursor) params.set('cursor', olderCursor);
+  else if (oldestTimestamp) params.set('before', oldestTimestamp);
+  const res = await fetch(`/chat/history?${params}`);
+  if (!res.ok) return;
+  const page = await res.json();
+  document.getElementById('messages').prepend(...page.messages.reverse().map(renderMessage));
+  olderCursor = page.next_cursor;
+  return Boolean(olderCursor);
+}
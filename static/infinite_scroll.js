@@ -0,0 +1,36 @@
+// Подгрузка следующих страниц списка заданий при прокрутке (курсорная пагинация /api/jobs)
+
+function escapeHtml(text) {
+  const div = document.createElement('div');
+  div.textContent = text ?? '';
+  return div.innerHTML;
+}
+
+function initInfiniteScroll({ view, sentinel, container, render }) {
+  if (!sentinel || !container) return;
+  let cursor = sentinel.dataset.cursor;
+  let loading = false;
+  const params = new URLSearchParams(window.location.search);
+
+  const observer = new IntersectionObserver(async entries => {
+    if (!entries.some(entry => entry.isIntersecting) || loading || !cursor) return;
+    loading = true;
+    try {
+      params.set('view', view);
+      params.set('cursor', cursor);
+      const res = await fetch(`/api/jobs?${params}`);
+      if (!res.ok) throw new Error(`Ошибка сервера: ${res.status}`);
+      const page = await res.json();
+      container.insertAdjacentHTML('beforeend', page.jobs.map(render).join(''));
+      cursor = page.next_cursor;
+      observer.unobserve(sentinel);
+      if (cursor) observer.observe(sentinel); // повторная проверка, если страж всё ещё на экране
+    } catch (err) {
+      console.error('Ошибка подгрузки заданий:', err);
+    } finally {
+      loading = false;
+    }
+  }, { rootMargin: '400px' });
+
+  if (cursor) observer.observe(sentinel);
+}
@@ -0,0 +1,146 @@
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scheduling import RateLimiter
+from users.models import db, SentJob, TelegramOutbox
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE = 5
+BACKOFF_MAX = 600
+
+
+class TelegramError(Exception):
+    def __init__(self, message, retry_after=None, permanent=False):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.permanent = permanent
+
+
+def enqueue(chat_id, text, user_id=None, job_url=None):
+    """Add a notification to the outbox in the current session; it is sent after the caller commits."""
+    if not chat_id:
+        return None
+    entry = TelegramOutbox(chat_id=str(chat_id), text=text, user_id=user_id, job_url=job_url)
+    db.session.add(entry)
+    return entry
+
+
+class TelegramSender:
+    """Delivers pending outbox rows through one pooled HTTP session.
+
+    Respects a global messages-per-second limit and a minimum interval per
+    chat, retries 429 (honouring retry_after) and 5xx with exponential
+    backoff, and uses SentJob so a job link is delivered to a user once.
+    """
+
+    def __init__(self, token, api_base="https://api.telegram.org", per_second=25, chat_interval=1.0,
+                 batch_size=50, max_attempts=5, timeout=10):
+        self.token = token
+        self.api_base = api_base.rstrip("/")
+        self.chat_interval = chat_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=4, max_retries=0))
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=4, max_retries=0))
+        self._global = RateLimiter(per_second, period=1.0)
+        self._chat_ready = {}
+
+    def send(self, chat_id, text):
+        url = f"{self.api_base}/bot{self.token}/sendMessage"
+        try:
+            response = self.session.post(url, json={"chat_id": chat_id, "text": text, "parse_mode": "HTML"}, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise TelegramError(str(e))
+        if response.ok:
+            return
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        description = data.get("description") or response.reason or ""
+        message = f"{response.status_code} {description}"
+        if response.status_code == 429:
+            raise TelegramError(message, retry_after=(data.get("parameters") or {}).get("retry_after", BACKOFF_BASE))
+        raise TelegramError(message, permanent=response.status_code < 500)
+
+    def _wait_for_chat(self, chat_id):
+        delay = self._chat_ready.get(chat_id, 0) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._global.acquire()
+
+    @staticmethod
+    def _hold_chat(entry):
+        """Keep the chat's later pending messages behind a rescheduled one so they are not delivered first."""
+        (TelegramOutbox.query
+         .filter(TelegramOutbox.chat_id == entry.chat_id, TelegramOutbox.status == "pending",
+                 TelegramOutbox.id > entry.id, TelegramOutbox.next_attempt_at < entry.next_attempt_at)
+         .update({"next_attempt_at": entry.next_attempt_at}, synchronize_session=False))
+
+    @staticmethod
+    def _round_robin(entries):
+        """Interleave chats so one busy chat does not hold up the others."""
+        seen = defaultdict(int)
+        ordered = []
+        for entry in entries:
+            ordered.append((seen[entry.chat_id], entry.id, entry))
+            seen[entry.chat_id] += 1
+        return [entry for _, _, entry in sorted(ordered, key=lambda item: item[:2])]
+
+    def deliver_pending(self):
+        """Send one batch of due outbox rows; must run inside an app context. Returns counts."""
+        counts = {"sent": 0, "retry": 0, "failed": 0, "skipped": 0}
+        if not self.token:
+            logger.warning("Telegram token не найден в .env, уведомления остаются в очереди")
+            return counts
+        entries = (TelegramOutbox.query
+                   .filter(TelegramOutbox.status == "pending", TelegramOutbox.next_attempt_at <= datetime.utcnow())
+                   .order_by(TelegramOutbox.id)
+                   .limit(self.batch_size)
+                   .all())
+        held = set()
+        for entry in self._round_robin(entries):
+            # Чат ждёт повтора более раннего сообщения — остальные его сообщения идут после него
+            if entry.chat_id in held:
+                continue
+            if entry.job_url and entry.user_id and SentJob.query.filter_by(job_url=entry.job_url, user_id=entry.user_id).first():
+                entry.status = "sent"
+                counts["skipped"] += 1
+                db.session.commit()
+                continue
+            self._wait_for_chat(entry.chat_id)
+            entry.attempts += 1
+            try:
+                self.send(entry.chat_id, entry.text)
+            except TelegramError as e:
+                entry.last_error = str(e)[:255]
+                if e.permanent or entry.attempts >= self.max_attempts:
+                    entry.status = "failed"
+                    counts["failed"] += 1
+                    logger.error(f"Ошибка отправки Telegram в чат {entry.chat_id}: {e}")
+                else:
+                    delay = e.retry_after or min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (entry.attempts - 1))
+                    entry.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+                    self._chat_ready[entry.chat_id] = time.monotonic() + (e.retry_after or 0)
+                    held.add(entry.chat_id)
+                    self._hold_chat(entry)
+                    counts["retry"] += 1
+                    logger.warning(f"Telegram: повтор отправки в чат {entry.chat_id} через {delay} с ({e})")
+            else:
+                entry.status = "sent"
+                entry.sent_at = datetime.utcnow()
+                if entry.job_url and entry.user_id:
+                    db.session.add(SentJob(job_url=entry.job_url, user_id=entry.user_id))
+                counts["sent"] += 1
+            finally:
+                self._chat_ready[entry.chat_id] = max(self._chat_ready.get(entry.chat_id, 0), time.monotonic() + self.chat_interval)
+            db.session.commit()
+        return counts
@@ -0,0 +1,33 @@
+import os
+import shutil
+import sys
+
+import pytest
+from flask import Flask
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+# Всё, что нужно для импорта app.py, без базы, кэшей, логов и node_modules
+APP_COPY_IGNORE = shutil.ignore_patterns(".git", "node_modules", "db.sqlite3*", "cache", "logs", "results", "tests", "__pycache__", "*.patch")
+
+
+@pytest.fixture
+def app_dir(tmp_path):
+    """Copy of the project with an empty database, for tests that import app.py in a subprocess."""
+    target = tmp_path / "app"
+    shutil.copytree(ROOT, target, ignore=APP_COPY_IGNORE)
+    return target
+
+
+@pytest.fixture
+def db_app():
+    """Bare Flask app on an in-memory database with all tables, inside an app context."""
+    from users.models import db
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
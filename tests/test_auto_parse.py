@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+
+SCRIPT = r'''
+import json
+
+import app as A
+
+
+def flaky_iter_parser(source, topic, min_price, max_price, region, known=None):
+    if source == "upwork":
+        raise RuntimeError("browser crashed")
+    yield {"title": "Guru job", "description": "python " * 30, "budget": "$150", "link": "https://stub/guru/1", "region": ""}
+
+
+A.iter_parser = flaky_iter_parser
+plan = {"product": "python", "min_price": 0, "max_price": None, "region": "", "configs": []}
+with A.auto_parse_cycles.cycle() as stats:
+    try:
+        A.run_auto_parse_plan(plan, stats)
+    except RuntimeError:
+        pass
+print(json.dumps(stats))
+'''
+
+
+def test_failed_source_is_counted_in_cycle_stats(app_dir):
+    env = {**os.environ, "OPENAI_API_KEY": "test", "PARSER_DAEMON": "0"}
+    env["PYTHONPATH"] = os.pathsep.join([str(app_dir), *sys.path])
+    result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=app_dir, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr[-3000:]
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert stats["errors"] == 1
+    [entry] = stats["products"]
+    assert "upwork: browser crashed" in entry["error"]
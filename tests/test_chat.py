@@ -0,0 +1,26 @@
+import threading
+from datetime import datetime
+
+from chat import ChatStore, message_dict
+
+
+class RacingStore(ChatStore):
+    """History loads slowly enough that another thread posts to the room meanwhile."""
+
+    def __init__(self):
+        super().__init__(app=None, spawn=lambda target: None)
+        self.raced = False
+
+    def history(self, room, before=None, limit=50):
+        if not self.raced:
+            self.raced = True
+            poster = threading.Thread(target=self.add, args=(room, 2, "bob", "new"))
+            poster.start()
+            poster.join()
+        old = [message_dict(room, 1, "alice", text, datetime(2026, 1, 1, 12, minute)) for minute, text in ((1, "old 2"), (0, "old 1"))]
+        return old, None
+
+
+def test_history_warm_up_keeps_messages_in_order():
+    store = RacingStore()
+    assert [message["msg"] for message in store.recent("general")] == ["old 1", "old 2", "new"]
@@ -0,0 +1,111 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("eventlet")
+
+# Выполняется в отдельном процессе: monkey_patch() нельзя откатить внутри pytest
+SCRIPT = r'''
+# Транспорт httpx (клиент OpenAI) грузится лениво и в некоторых сборках тянет trio,
+# которому нужен нетронутый select, поэтому импортируем его до патча
+import importlib
+for name in ("httpcore", "httpcore2", "trio"):
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        pass
+
+import eventlet
+eventlet.monkey_patch()
+
+import json
+import sys
+import time
+
+import app as A
+from parser_daemon import spawn_parser
+
+RECORDS = 10
+DELAY = 0.3
+
+# Медленный «парсер» — настоящий дочерний процесс, как node, печатающий NDJSON с паузами
+CHILD = (
+    "import json, sys, time\n"
+    f"for i in range({RECORDS}):\n"
+    f"    time.sleep({DELAY})\n"
+    "    print(json.dumps({'title': f'Slow {sys.argv[1]} {i}', 'description': 'python ' * 30, "
+    "'budget': '$150', 'link': f'https://slow/{sys.argv[1]}/{i}', 'region': ''}), flush=True)\n"
+)
+
+
+def slow_iter_parser(source, topic, min_price, max_price, region, known=None):
+    return spawn_parser([sys.executable, "-c", CHILD, source])
+
+
+A.iter_parser = slow_iter_parser
+
+with A.app.app_context():
+    user = A.User(username="green")
+    user.set_password("green")
+    A.db.session.add(user)
+    A.db.session.commit()
+
+gaps = []
+
+
+def ticker():
+    last = time.monotonic()
+    while True:
+        eventlet.sleep(0.01)
+        now = time.monotonic()
+        gaps.append(now - last)
+        last = now
+
+
+client = A.app.test_client()
+client.post("/auth/login", data={"username": "green", "password": "green"})
+eventlet.spawn(ticker)
+
+started = time.monotonic()
+response = client.post("/search", json={"query": "python", "min_price": "0"})
+search_id = response.get_json()["search_id"]
+latencies = []
+status = None
+while time.monotonic() - started < 30:
+    t = time.monotonic()
+    status = client.get(f"/search/{search_id}").get_json()
+    latencies.append(time.monotonic() - t)
+    if status["status"] in ("done", "error"):
+        break
+    eventlet.sleep(0.05)
+
+print(json.dumps({
+    "search_status": response.status_code,
+    "status": status["status"],
+    "jobs": status.get("total"),
+    "scrape_seconds": time.monotonic() - started,
+    "requests": len(latencies),
+    "max_request": max(latencies),
+    "max_tick_gap": max(gaps),
+}))
+'''
+
+
+def test_requests_are_served_during_a_long_scrape(app_dir):
+    env = {**os.environ, "OPENAI_API_KEY": "test", "PARSER_DAEMON": "0"}
+    env["PYTHONPATH"] = os.pathsep.join([str(app_dir), *sys.path])
+    result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=app_dir, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-3000:]
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert stats["search_status"] == 202
+    assert stats["status"] == "done"
+    assert stats["jobs"] > 0
+    # Парсинг шёл несколько секунд (пауза парсера — 0.3 с), а хаб и запросы ни разу не замирали на такой срок
+    assert stats["scrape_seconds"] > 2
+    assert stats["requests"] > 10
+    assert stats["max_request"] < 0.2
+    assert stats["max_tick_gap"] < 0.2
@@ -0,0 +1,233 @@
+import os
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+
+from http_scraper import (
+    HttpScraper, NeedsBrowser, SOURCES, first_dollar_amount, is_js_shell, make_record, parse_detail, parse_html,
+    parse_listing,
+)
+from known_links import BloomFilter, link_key
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "http_scraper")
+UPWORK_SEARCH = SOURCES["upwork"]["search_url"]("python")
+GURU_SEARCH = SOURCES["guru"]["search_url"]("python")
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class StubResponse:
+    def __init__(self, url, status_code, text):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for url: {self.url}")
+
+
+class StubSession:
+    """Serves pages by URL path: {path: html} or {path: (status, html)}."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def get(self, url, timeout=None):
+        path = urlsplit(url).path
+        self.requested.append(path)
+        page = self.pages.get(path, (404, ""))
+        status, text = page if isinstance(page, tuple) else (200, page)
+        return StubResponse(url, status, text)
+
+
+def stub_scraper(source, pages):
+    scraper = HttpScraper()
+    session = StubSession(pages)
+    scraper._sessions[source] = session
+    return scraper, session
+
+
+def test_parse_listing_upwork():
+    links = parse_listing("upwork", fixture("upwork_listing.html"), UPWORK_SEARCH)
+    assert links == [
+        "https://www.upwork.com/jobs/Python-scraper-for-listings_~01a1b2c3d4e5f6a7b8/?referrer_url_path=/nx/search/jobs/",
+        "https://www.upwork.com/jobs/Django-REST-API-developer_~01f0e1d2c3b4a59687/?referrer_url_path=/nx/search/jobs/",
+    ]
+
+
+def test_parse_listing_guru():
+    links = parse_listing("guru", fixture("guru_listing.html"), GURU_SEARCH)
+    assert links == [
+        "https://www.guru.com/d/jobs/id/2012345/Build-a-Telegram-Bot/",
+        "https://www.guru.com/d/jobs/id/2012399/Flask-Dashboard/",
+    ]
+
+
+def test_parse_detail_upwork():
+    card = parse_detail("upwork", fixture("upwork_detail.html"))
+    assert card == {
+        "title": "Python scraper for listings",
+        "description": "We need a scraper for two job boards. It should store jobs in SQLite & send Telegram alerts.\nDeadline: two weeks.",
+        "price": 1500.0,
+        "region": "Germany",
+    }
+
+
+def test_parse_detail_guru():
+    card = parse_detail("guru", fixture("guru_detail.html"))
+    assert card == {
+        "title": "Build a Telegram Bot",
+        "description": "Fixed Price Budget: $250-$500\nThe bot should forward new orders to a channel.\nPython preferred.",
+        "price": 250.0,
+        "region": "United States, Canada",
+    }
+
+
+def test_parse_detail_without_h1_needs_browser():
+    assert parse_detail("upwork", fixture("upwork_shell.html")) is None
+
+
+def test_js_shell_detection():
+    assert is_js_shell(parse_html(fixture("upwork_shell.html")))
+    assert not is_js_shell(parse_html(fixture("guru_empty_listing.html")))
+
+
+@pytest.mark.parametrize("text, amount", [
+    ("Budget: $1,250.50 fixed", 1250.5),
+    ("Hourly $35.00 - $60.00", 35.0),
+    ("$ 80", 80.0),
+    ("no price here", None),
+    ("$.", None),
+    (None, None),
+])
+def test_first_dollar_amount(text, amount):
+    assert first_dollar_amount(text) == amount
+
+
+def test_make_record_shape_and_filters():
+    card = parse_detail("guru", fixture("guru_detail.html"))
+    link = "https://www.guru.com/d/jobs/id/2012345/Build-a-Telegram-Bot/"
+    assert make_record("guru", link, card) == {
+        "title": "Guru: Build a Telegram Bot",
+        "budget": "$250",
+        "description": card["description"],
+        "link": link,
+        "region": "United States, Canada",
+    }
+    assert make_record("guru", link, card, min_price="100", max_price="300", region="canada") is not None
+    assert make_record("guru", link, card, min_price=300) is None
+    assert make_record("guru", link, card, max_price=200) is None
+    assert make_record("guru", link, card, region="germany") is None
+
+
+def test_make_record_without_price_ignores_price_filter():
+    card = {"title": "T", "description": "D", "price": None, "region": "Не указан"}
+    record = make_record("upwork", "https://x/1", card, min_price=500)
+    assert record["budget"] == "неизвестно"
+    assert record["title"] == "Upwork: T"
+    assert make_record("upwork", "https://x/1", card, region="usa") is None
+
+
+def test_make_record_formats_fractional_price():
+    card = {"title": "T", "description": "D", "price": 12.5, "region": ""}
+    assert make_record("upwork", "https://x/1", card)["budget"] == "$12.5"
+
+
+def test_scrape_iter_yields_records_in_listing_order():
+    scraper, session = stub_scraper("guru", {
+        "/d/jobs/q/python/": fixture("guru_listing.html"),
+        "/d/jobs/id/2012345/Build-a-Telegram-Bot/": fixture("guru_detail.html"),
+        "/d/jobs/id/2012399/Flask-Dashboard/": fixture("guru_detail.html").replace("Build a Telegram Bot", "Flask Dashboard"),
+    })
+    records = list(scraper.scrape_iter("guru", "python", concurrency=2))
+    assert [record["title"] for record in records] == ["Guru: Build a Telegram Bot", "Guru: Flask Dashboard"]
+    assert [record["link"] for record in records] == parse_listing("guru", fixture("guru_listing.html"), GURU_SEARCH)
+
+
+def test_scrape_iter_skips_known_links():
+    known = BloomFilter(10)
+    known.add(link_key("https://www.guru.com/d/jobs/id/2012345/Build-a-Telegram-Bot/"))
+    scraper, session = stub_scraper("guru", {
+        "/d/jobs/q/python/": fixture("guru_listing.html"),
+        "/d/jobs/id/2012399/Flask-Dashboard/": fixture("guru_detail.html"),
+    })
+    records = list(scraper.scrape_iter("guru", "python", known=known))
+    assert [record["link"] for record in records] == ["https://www.guru.com/d/jobs/id/2012399/Flask-Dashboard/"]
+    assert "/d/jobs/id/2012345/Build-a-Telegram-Bot/" not in session.requested
+
+
+def test_scrape_iter_defers_blocked_and_js_cards_to_browser():
+    upwork_links = parse_listing("upwork", fixture("upwork_listing.html"), UPWORK_SEARCH)
+    known = BloomFilter(10)
+    known.add(link_key("https://www.upwork.com/jobs/already-stored_~01/"))
+    scraper, _ = stub_scraper("upwork", {
+        "/nx/jobs/search/": fixture("upwork_listing.html"),
+        "/jobs/Python-scraper-for-listings_~01a1b2c3d4e5f6a7b8/": fixture("upwork_detail.html"),
+        "/jobs/Django-REST-API-developer_~01f0e1d2c3b4a59687/": (403, "Just a moment..."),
+    })
+    records = []
+    with pytest.raises(NeedsBrowser) as error:
+        for record in scraper.scrape_iter("upwork", "python", known=known):
+            records.append(record)
+
+    assert [record["link"] for record in records] == [upwork_links[0]]
+    extended = error.value.known
+    # Браузер откроет только заблокированную карточку: остальное уже известно или прочитано по HTTP
+    assert link_key(upwork_links[0]) in extended
+    assert link_key("https://www.upwork.com/jobs/already-stored_~01/") in extended
+    assert link_key(upwork_links[1]) not in extended
+    # Фильтр вызывающего не меняется — его разделяют потоки обоих источников
+    assert extended is not known
+    assert link_key(upwork_links[0]) not in known
+
+
+def test_scrape_iter_js_rendered_detail_needs_browser():
+    scraper, _ = stub_scraper("guru", {
+        "/d/jobs/q/python/": fixture("guru_listing.html"),
+        "/d/jobs/id/2012345/Build-a-Telegram-Bot/": fixture("upwork_shell.html"),
+        "/d/jobs/id/2012399/Flask-Dashboard/": fixture("guru_detail.html"),
+    })
+    with pytest.raises(NeedsBrowser) as error:
+        list(scraper.scrape_iter("guru", "python"))
+    assert link_key("https://www.guru.com/d/jobs/id/2012399/Flask-Dashboard/") in error.value.known
+    assert link_key("https://www.guru.com/d/jobs/id/2012345/Build-a-Telegram-Bot/") not in error.value.known
+
+
+def test_scrape_iter_broken_card_is_skipped_without_browser():
+    scraper, _ = stub_scraper("guru", {
+        "/d/jobs/q/python/": fixture("guru_listing.html"),
+        "/d/jobs/id/2012399/Flask-Dashboard/": fixture("guru_detail.html"),
+    })
+    records = list(scraper.scrape_iter("guru", "python"))
+    assert [record["link"] for record in records] == ["https://www.guru.com/d/jobs/id/2012399/Flask-Dashboard/"]
+
+
+def test_blocked_listing_needs_browser():
+    known = BloomFilter(10)
+    scraper, _ = stub_scraper("upwork", {"/nx/jobs/search/": (403, "Just a moment...")})
+    with pytest.raises(NeedsBrowser) as error:
+        list(scraper.scrape_iter("upwork", "python", known=known))
+    assert error.value.known is known
+
+
+def test_js_shell_listing_needs_browser():
+    scraper, _ = stub_scraper("upwork", {"/nx/jobs/search/": fixture("upwork_shell.html")})
+    with pytest.raises(NeedsBrowser):
+        list(scraper.scrape_iter("upwork", "python"))
+
+
+def test_empty_listing_does_not_start_browser():
+    scraper, session = stub_scraper("guru", {"/d/jobs/q/python/": fixture("guru_empty_listing.html")})
+    assert list(scraper.scrape_iter("guru", "python")) == []
+    assert session.requested == ["/d/jobs/q/python/"]
+
+
+def test_empty_response_is_an_empty_page():
+    assert parse_listing("guru", "", GURU_SEARCH) == []
+    assert parse_detail("guru", "") is None
@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+from ingest import iter_batches
+
+
+def timed_batches(records, **kwargs):
+    started = time.monotonic()
+    return [(batch, time.monotonic() - started) for batch in iter_batches(records, **kwargs)]
+
+
+def test_burst_is_flushed_without_waiting_for_the_next_record():
+    def source():
+        yield 1
+        time.sleep(0.3)
+        # Медленная карточка задержала упорядоченный вывод: следующие записи приходят пачкой
+        yield from (2, 3, 4)
+        time.sleep(1)
+        yield 5
+
+    batches = timed_batches(source(), max_gap=0.05)
+    assert [batch for batch, _ in batches] == [[1], [2, 3, 4], [5]]
+    assert batches[1][1] < 0.6
+
+
+def test_back_to_back_records_are_grouped_up_to_size():
+    batches = [batch for batch in iter_batches(iter(range(7)), size=3, max_gap=1)]
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_source_error_is_raised_after_the_records_before_it():
+    def source():
+        yield 1
+        raise RuntimeError("parser crashed")
+
+    batches = []
+    with pytest.raises(RuntimeError, match="parser crashed"):
+        for batch in iter_batches(source(), max_gap=0.05):
+            batches.append(batch)
+    assert batches == [[1]]
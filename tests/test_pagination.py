@@ -0,0 +1,57 @@
+import base64
+import json
+
+import pytest
+
+from pagination import encode_cursor, keyset_page
+from users.models import db, Job, User
+
+
+@pytest.fixture
+def jobs_app(db_app):
+    user = User(username="pager", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    for i in range(5):
+        db.session.add(Job(title=f"Job {i}", link=f"https://jobs/{i}", budget_max=100.0 * i if i % 2 else None, user_id=user.id))
+    db.session.commit()
+    return db_app
+
+
+def raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def test_pages_follow_each_other(jobs_app):
+    seen = []
+    cursor = None
+    for _ in range(5):
+        jobs, cursor = keyset_page(Job.query, cursor, limit=2)
+        seen.extend(job.id for job in jobs)
+        if not cursor:
+            break
+    assert sorted(seen) == [1, 2, 3, 4, 5]
+    assert len(seen) == 5
+
+
+@pytest.mark.parametrize("order, values", [
+    ("budget", [{}]),
+    ("budget", [{}, 1]),
+    ("budget", ["100", 1]),
+    ("budget", [100, "1"]),
+    ("budget", [100, True]),
+    ("budget", [100, [1]]),
+    ("budget", [100, 1.5]),
+    ("id", [{}]),
+    ("id", ["1"]),
+    ("id", [None]),
+])
+def test_tampered_cursor_returns_first_page(jobs_app, order, values):
+    first_page, _ = keyset_page(Job.query, None, limit=2, order=order)
+    jobs, _ = keyset_page(Job.query, raw_cursor(values), limit=2, order=order)
+    assert [job.id for job in jobs] == [job.id for job in first_page]
+
+
+def test_cursor_with_null_budget_is_accepted(jobs_app):
+    jobs, _ = keyset_page(Job.query, encode_cursor([None, 5]), limit=10)
+    assert [job.id for job in jobs] == [3, 1]
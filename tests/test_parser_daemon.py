@@ -0,0 +1,51 @@
+import subprocess
+
+import pytest
+
+from parser_daemon import ParserDaemon
+
+# Демон-заглушка с протоколом parsers/parser_daemon.js: две карточки и done на каждый запрос
+FAKE_DAEMON = r"""
+const readline = require('readline');
+const rl = readline.createInterface({ input: process.stdin });
+rl.on('line', line => {
+  const request = JSON.parse(line);
+  for (let i = 0; i < 2; i++) {
+    process.stdout.write(JSON.stringify({ id: request.id, job: { title: `${request.topic} ${i}`, concurrency: request.concurrency } }) + '\n');
+  }
+  process.stdout.write(JSON.stringify({ id: request.id, done: true, count: 2 }) + '\n');
+});
+"""
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    script = tmp_path / "fake_daemon.js"
+    script.write_text(FAKE_DAEMON, encoding="utf-8")
+    daemon = ParserDaemon(str(script), timeout=10)
+    yield daemon
+    daemon.stop()
+
+
+def test_scrape_iter_streams_jobs(daemon):
+    jobs = list(daemon.scrape_iter("upwork", "python", concurrency=3))
+    assert jobs == [{"title": "python 0", "concurrency": 3}, {"title": "python 1", "concurrency": 3}]
+    assert daemon._pending == {}
+
+
+def test_daemon_that_died_after_start_is_restarted(daemon):
+    dead = subprocess.Popen(["node", "-e", ""], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+    dead.wait()
+    real_start = daemon.start
+    starts = []
+
+    def start():
+        # Первый start() отдаёт процесс, который уже умер, — как если бы демон упал сразу после проверки
+        starts.append(1)
+        return dead if len(starts) == 1 else real_start()
+
+    daemon.start = start
+    jobs = list(daemon.scrape_iter("guru", "flask"))
+    assert [job["title"] for job in jobs] == ["flask 0", "flask 1"]
+    assert len(starts) == 2
+    assert daemon._pending == {}
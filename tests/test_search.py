@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+
+# Процесс без monkey_patch(), как `python app.py`, `flask run` и тестовый клиент Flask
+SCRIPT = r'''
+import json
+import time
+
+import app as A
+
+
+def stub_iter_parser(source, topic, min_price, max_price, region, known=None):
+    for i in range(3):
+        yield {"title": f"{source} {i}", "description": "python " * 30, "budget": "$150",
+               "link": f"https://stub/{source}/{i}", "region": ""}
+
+
+A.iter_parser = stub_iter_parser
+
+with A.app.app_context():
+    user = A.User(username="plain")
+    user.set_password("plain")
+    A.db.session.add(user)
+    A.db.session.commit()
+    user_id = user.id
+
+client = A.app.test_client()
+client.post("/auth/login", data={"username": "plain", "password": "plain"})
+response = client.post("/search", json={"query": "python", "min_price": "0"})
+search_id = response.get_json()["search_id"]
+with A.app.app_context():
+    A.chat_store.add(A.DEFAULT_ROOM, user_id, "plain", "hello")
+
+started = time.monotonic()
+status = None
+stored = 0
+while time.monotonic() - started < 20:
+    status = client.get(f"/search/{search_id}").get_json()
+    with A.app.app_context():
+        stored = A.ChatMessage.query.count()
+    if status["status"] in ("done", "error") and stored:
+        break
+    time.sleep(0.05)
+
+print(json.dumps({
+    "async_mode": A.socketio.async_mode,
+    "search_status": response.status_code,
+    "status": status["status"],
+    "jobs": status.get("total"),
+    "chat_messages": stored,
+}))
+'''
+
+
+def test_search_finishes_without_eventlet_patching(app_dir):
+    env = {**os.environ, "OPENAI_API_KEY": "test", "PARSER_DAEMON": "0"}
+    env["PYTHONPATH"] = os.pathsep.join([str(app_dir), *sys.path])
+    result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=app_dir, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr[-3000:]
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+
+    # Даже если eventlet установлен, без патча фоновые задачи идут в обычных потоках
+    assert stats["async_mode"] == "threading"
+    assert stats["search_status"] == 202
+    assert stats["status"] == "done"
+    assert stats["jobs"] == 6
+    assert stats["chat_messages"] == 1
@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from telegram_outbox import TelegramError, TelegramSender, enqueue
+from users.models import db, TelegramOutbox
+
+
+class BotApiStub(ThreadingHTTPServer):
+    """Local sendMessage endpoint; `replies` maps a text to the (status, body) answers to give before a 200.
+
+    A dict body is sent as JSON, a str body as is (an HTML error page of a proxy).
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), BotApiHandler)
+        self.replies = {}
+        self.delivered = []
+        self.connections = set()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class BotApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        stub = self.server
+        stub.connections.add(self.client_address)
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        assert self.path == "/bottoken/sendMessage"
+        replies = stub.replies.get(payload["text"])
+        status, body = replies.pop(0) if replies else (200, {"ok": True, "result": {}})
+        if status == 200:
+            stub.delivered.append((payload["chat_id"], payload["text"]))
+        data = (body if isinstance(body, str) else json.dumps(body)).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html" if isinstance(body, str) else "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def bot_api():
+    stub = BotApiStub()
+    thread = threading.Thread(target=stub.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+@pytest.fixture
+def sender(bot_api):
+    return TelegramSender("token", api_base=bot_api.url, per_second=1000, chat_interval=0)
+
+
+def too_many_requests(retry_after):
+    return 429, {"ok": False, "error_code": 429, "description": "Too Many Requests: retry later",
+                 "parameters": {"retry_after": retry_after}}
+
+
+def test_send_uses_one_pooled_connection(bot_api, sender):
+    for text in ("a", "b", "c"):
+        sender.send("A", text)
+    assert bot_api.delivered == [("A", "a"), ("A", "b"), ("A", "c")]
+    assert len(bot_api.connections) == 1
+
+
+@pytest.mark.parametrize("reply, retry_after, permanent", [
+    (too_many_requests(7), 7, False),
+    ((500, {"ok": False, "description": "Internal Server Error"}), None, False),
+    ((502, "<html>Bad Gateway</html>"), None, False),
+    ((400, {"ok": False, "description": "Bad Request: chat not found"}), None, True),
+    ((403, {"ok": False, "description": "Forbidden: bot was blocked by the user"}), None, True),
+])
+def test_send_classifies_errors(bot_api, sender, reply, retry_after, permanent):
+    bot_api.replies["hi"] = [reply]
+    with pytest.raises(TelegramError) as error:
+        sender.send("A", "hi")
+    assert str(error.value).startswith(str(reply[0]))
+    assert error.value.retry_after == retry_after
+    assert error.value.permanent is permanent
+
+
+def test_rescheduled_message_keeps_its_place_in_the_chat(db_app, bot_api, sender):
+    for chat_id, text in (("A", "a1"), ("A", "a2"), ("B", "b1"), ("A", "a3")):
+        enqueue(chat_id, text)
+    db.session.commit()
+    bot_api.replies["a1"] = [too_many_requests(0.05)]
+
+    counts = sender.deliver_pending()
+    # a1 ждёт повтора, поэтому a2 и a3 в этой пачке не уходят; другой чат не задерживается
+    assert bot_api.delivered == [("B", "b1")]
+    assert counts["retry"] == 1
+    first, *later = TelegramOutbox.query.filter_by(chat_id="A").order_by(TelegramOutbox.id).all()
+    assert all(entry.status == "pending" and entry.next_attempt_at >= first.next_attempt_at for entry in later)
+
+    time.sleep(0.1)
+    sender.deliver_pending()
+    assert bot_api.delivered == [("B", "b1"), ("A", "a1"), ("A", "a2"), ("A", "a3")]
+
+
+def test_permanent_failure_does_not_hold_the_chat(db_app, bot_api, sender):
+    for text in ("a1", "a2"):
+        enqueue("A", text)
+    db.session.commit()
+    bot_api.replies["a1"] = [(400, {"ok": False, "description": "Bad Request: message is too long"})]
+
+    counts = sender.deliver_pending()
+    assert counts["failed"] == 1
+    assert bot_api.delivered == [("A", "a2")]
+    assert TelegramOutbox.query.filter_by(text="a1").one().last_error == "400 Bad Request: message is too long"
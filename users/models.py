@@ -51,17 +51,26 @@ class Favorite(db.Model):
 class ChatMessage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    room = db.Column(db.String(50), nullable=False, default="general", server_default="general")
     message = db.Column(db.Text, nullable=False)
     timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     user = db.relationship('User', backref='messages', lazy='select')
 
+    __table_args__ = (
+        db.Index('ix_chat_message_room_timestamp', 'room', 'timestamp', 'id'),
+    )
+
 # 💼 Задание
 class Job(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False, default="Без названия")
     description = db.Column(db.Text, nullable=False, default="")
+    description_preview = db.column_property(db.func.substr(description, 1, 300), deferred=True)  # для списков без полного текста
     budget = db.Column(db.String(50), nullable=True)
+    budget_min = db.Column(db.Float, nullable=True)
+    budget_max = db.Column(db.Float, nullable=True)
+    budget_kind = db.Column(db.String(10), nullable=False, default="unknown", server_default="unknown")  # fixed / hourly / unknown
     link = db.Column(db.String(255), unique=True, nullable=False)
     status = db.Column(db.String(50), nullable=False, default="new")
     assigned_to = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
@@ -75,8 +84,53 @@ class Job(db.Model):
     assignee = db.relationship('User', backref='assigned_jobs', lazy='select', foreign_keys=[assigned_to])
     user = db.relationship('User', backref='owned_jobs', lazy='select', foreign_keys=[user_id])  # Связь для владельца задачи
 
+    __table_args__ = (
+        db.Index('ix_job_user_status_budget', 'user_id', 'status', 'budget_max', 'id'),
+        db.Index('ix_job_user_budget', 'user_id', 'budget_max', 'id'),
+    )
+
 # 📤 Отправленные задачи (например, в телеграм)
 class SentJob(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     job_url = db.Column(db.String(300))
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
\ No newline at end of file
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+
+# 🗄️ Кэш результатов поиска (ключ — нормализованные параметры запроса)
+class SearchCacheEntry(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(255), unique=True, nullable=False)
+    results = db.Column(db.Text, nullable=False, default="[]")
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    accessed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+# 📬 Очередь уведомлений Telegram (пишется в одной транзакции с заданием)
+class TelegramOutbox(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    chat_id = db.Column(db.String(50), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    job_url = db.Column(db.String(300), nullable=True)
+    text = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default="pending", server_default="pending")  # pending / sent / failed
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_telegram_outbox_status_next', 'status', 'next_attempt_at'),
+    )
+
+# 🧠 Кэш ответов LLM (ключ — sha256 от модели, промпта, нормализованного текста и параметров)
+class LLMCacheEntry(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(64), unique=True, nullable=False)
+    response = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    accessed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+# 🔒 Аренда лидерства планировщика: задания выполняет только владелец непросроченной записи
+class SchedulerLease(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    owner = db.Column(db.String(100), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,80 @@
+"""Scheduler worker: auto-parse, Telegram outbox delivery and background refresh.
+
+Run as its own process (`worker` in the Procfile). Any number of workers
+may run; only the holder of the "scheduler" lease in the database
+executes jobs, the others stay on standby and take over when it expires.
+"""
+import json
+import logging
+import signal
+import sys
+from datetime import datetime
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from app import app, run_auto_parse, deliver_telegram_outbox, background_pool, auto_parse_cycles, AUTO_PARSE_STATS_PATH
+from config import Config
+from leases import Lease
+
+logger = logging.getLogger(__name__)
+
+lease = Lease("scheduler", ttl=Config.SCHEDULER_LEASE_TTL)
+
+
+def renew_lease():
+    with app.app_context():
+        lease.renew()
+
+
+def auto_parse_job():
+    try:
+        run_auto_parse()
+    finally:
+        try:
+            with open(AUTO_PARSE_STATS_PATH, "w", encoding="utf-8") as f:
+                json.dump(auto_parse_cycles.snapshot(), f, ensure_ascii=False)
+        except OSError as e:
+            logger.error(f"Не удалось сохранить статистику автопарсинга: {e}")
+
+
+def build_scheduler():
+    scheduler = BlockingScheduler()
+    scheduler.add_job(renew_lease, trigger=IntervalTrigger(seconds=max(1, Config.SCHEDULER_LEASE_TTL // 3)),
+                      id='scheduler_lease', max_instances=1, coalesce=True)
+    scheduler.add_job(lease.guard(auto_parse_job), trigger=IntervalTrigger(minutes=Config.AUTO_PARSE_INTERVAL_MINUTES),
+                      id='auto_parse_job', max_instances=1, coalesce=True)
+    scheduler.add_job(lease.guard(deliver_telegram_outbox), trigger=IntervalTrigger(seconds=Config.TELEGRAM_OUTBOX_INTERVAL_SECONDS),
+                      id='telegram_outbox', max_instances=1, coalesce=True)
+    # Пул фонов обновляется в фоне; при пустом или устаревшем пуле — сразу при старте
+    scheduler.add_job(
+        lease.guard(background_pool.refresh),
+        trigger=IntervalTrigger(minutes=Config.BACKGROUND_REFRESH_MINUTES),
+        id='background_refresh',
+        max_instances=1,
+        coalesce=True,
+        **({} if background_pool.fresh() else {"next_run_time": datetime.now()})
+    )
+    return scheduler
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s %(name)s: %(message)s")
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    renew_lease()
+    if not lease.held:
+        logger.info("Планировщик: лидер уже есть, процесс в режиме ожидания")
+    scheduler = build_scheduler()
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        if scheduler.running:
+            scheduler.shutdown(wait=False)
+        with app.app_context():
+            lease.release()
+
+
+if __name__ == "__main__":
+    main()